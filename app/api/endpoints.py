@@ -1,17 +1,161 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from typing import List, Dict, Any
-import os
-import json
-import re
-from core.config import settings
+import asyncio
+import orjson
+from operator import attrgetter
 from services.extractor_service import ExtractorService
 from services.comparator_service import ComparatorService
-from models.seo import FullSEOResult, ComparisonResult
+from services.cache_service import CacheService
+from services.ai_service import get_ai_service, COMPARE_FALLBACKS
+from services.crawler_service import CrawlerService
+from models.seo import FullSEOResult, ComparisonResult, ComparisonResponse, BatchCompareRequest
 
 router = APIRouter()
 extractor_service = ExtractorService()
 comparator_service = ComparatorService()
+cache_service = CacheService()
+ai_service = get_ai_service()
+
+# Which way is better for a parameter: higher value, lower value, or present (bool)
+HIGHER, LOWER, BOOL = 0, 1, 2
+
+# (label, accessor, unit, missing, direction) for the detailed audit table.
+# Fields are already typed by the model; `missing` only stands in for Optional fields left unset.
+PARAMS_SPEC = [
+    # 1. Domain
+    ("Domain Authority", attrgetter("domain_authority.domain_authority"), "/100", 0.0, HIGHER),
+    ("Backlinks", attrgetter("domain_authority.total_backlinks"), "", 0, HIGHER),
+    ("Referring Domains", attrgetter("domain_authority.referring_domains"), "", 0, HIGHER),
+    ("Organic Keywords", attrgetter("domain_authority.organic_keywords"), "", 0, HIGHER),
+    ("HTTPS Secured", attrgetter("domain_authority.https_status"), "", False, BOOL),
+
+    # 2. Crawlability
+    ("Robots.txt", attrgetter("crawlability.robots_txt_exists"), "", False, BOOL),
+    ("XML Sitemap", attrgetter("crawlability.xml_sitemap_exists"), "", False, BOOL),
+    ("Orphan Pages", attrgetter("crawlability.orphan_pages"), "", 0, HIGHER),
+    ("Crawl Depth", attrgetter("crawlability.crawl_depth"), "", 0, HIGHER),
+
+    # 3. Content
+    ("Avg Word Count", attrgetter("content.avg_word_count"), " words", 0, HIGHER),
+    ("Thin Content Ratio", attrgetter("content.thin_content_ratio"), "%", 0.0, LOWER),
+    ("Readability Score", attrgetter("content.readability_score"), "/1.0", 0.0, HIGHER),
+    ("FAQ Presence", attrgetter("content.faq_presence"), "", False, BOOL),
+
+    # 4. YMYL & Trust (Critical)
+    ("IRDAI Reg. Display", attrgetter("ymyl.irdai_registration"), "", False, BOOL),
+    ("Claim Settlement Ratio", attrgetter("ymyl.claim_settlement_ratio"), "", False, BOOL),
+    ("Risk Disclaimer", attrgetter("ymyl.risk_disclaimer"), "", False, BOOL),
+    ("Privacy Policy", attrgetter("ymyl.privacy_policy_quality"), "", False, BOOL),
+    ("Contact/Grievance", attrgetter("ymyl.contact_grievance_info"), "", False, BOOL),
+
+    # 5. Technical
+    ("Page Load Time", attrgetter("technical.page_load_time"), "s", 0.0, LOWER),
+    ("TTFB", attrgetter("technical.ttfb"), "ms", 0.0, HIGHER),
+    ("LCP Score", attrgetter("technical.lcp_score"), "s", 0.0, HIGHER),
+    ("CLS Score", attrgetter("technical.cls_score"), "", 0.0, HIGHER),
+    ("JS Bundle Size", attrgetter("technical.js_bundle_weight"), "KB", 0.0, HIGHER),
+
+    # 6. Mobile
+    ("Mobile Responsiveness", attrgetter("mobile.mobile_responsive"), "", False, BOOL),
+    ("Mobile Speed Score", attrgetter("mobile.mobile_speed_score"), "/100", 0.0, HIGHER),
+    ("Tap Target Spacing", attrgetter("mobile.tap_element_spacing"), "", False, BOOL),
+
+    # 7. India Specific
+    ("INR Currency Use", attrgetter("india_specific.inr_currency_use"), "", False, BOOL),
+    ("Tax Keywords (80C)", attrgetter("india_specific.india_tax_keywords"), "", False, BOOL),
+    ("Hreflang en-IN", attrgetter("india_specific.hreflang_en_in"), "", False, BOOL),
+
+    # 8. Schema
+    ("Organization Schema", attrgetter("schema_data.organization_schema"), "", False, BOOL),
+    ("Product/Plan Schema", attrgetter("schema_data.product_schema"), "", False, BOOL),
+    ("FAQ Schema", attrgetter("schema_data.faq_schema"), "", False, BOOL),
+
+    # 9. Meta Signals
+    ("Title Tag Optimized", attrgetter("meta_html.title_length_optimized"), "", False, BOOL),
+    ("Meta Desc Presence", attrgetter("meta_html.meta_desc_presence"), "", False, BOOL),
+    ("H1 Hierarchy Valid", attrgetter("meta_html.heading_hierarchy_valid"), "", False, BOOL),
+    ("Img Alt Coverage", attrgetter("meta_html.image_alt_coverage"), "%", 0.0, HIGHER),
+]
+
+
+def get_cat_scores(data: FullSEOResult) -> Dict[str, float]:
+    """
+    Categorical scores for the Radar Chart.
+    """
+    # Strict scoring: normalized to 0-100, neutral defaults for unmeasured metrics
+    plt = data.technical.page_load_time
+    da = data.domain_authority.domain_authority
+
+    tech_score = max(0, 100 - ((3.0 if plt is None else plt) * 20))
+    content_score = data.content.readability_score * 100
+    trust_score = 100 if data.ymyl.irdai_registration and data.ymyl.claim_settlement_ratio else 60
+
+    return {
+        "Technical": round(tech_score, 1),
+        "Content": round(content_score, 1),
+        "Trust (YMYL)": round(float(trust_score), 1),
+        "Mobile": round(data.mobile.mobile_speed_score, 1),
+        "Authority": round(50.0 if da is None else da, 1)
+    }
+
+
+def sse(event: Dict[str, Any]) -> bytes:
+    """
+    Encodes a single Server-Sent Events frame.
+    """
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+# Fixed status frames of /compare/stream, encoded once at import
+SSE_STARTING = sse({'type': 'status', 'message': 'Starting analysis...'})
+SSE_ANALYZING = sse({'type': 'status', 'message': 'Analyzing content (100+ parameters)...'})
+SSE_REPORTING = sse({'type': 'status', 'message': 'Generating comparison report...'})
+
+
+def build_comparison(baseline: FullSEOResult, competitor: FullSEOResult) -> Dict[str, Any]:
+    """
+    Builds the comparison report (scores, categories and detailed audit table)
+    straight from the result models. The AI summary is added by the caller.
+    """
+    details = []
+    gaps_count = 0
+    for label, accessor, unit, missing, direction in PARAMS_SPEC:
+        bv = accessor(baseline)
+        if bv is None:
+            bv = missing
+        cv = accessor(competitor)
+        if cv is None:
+            cv = missing
+
+        if direction == BOOL:
+            gap = cv and not bv
+            b_text, c_text = ("Yes" if bv else "No"), ("Yes" if cv else "No")
+        else:
+            gap = bv > cv if direction == LOWER else bv < cv
+            b_text, c_text = f"{bv}{unit}", f"{cv}{unit}"
+
+        if gap:
+            gaps_count += 1
+        details.append({
+            "label": label,
+            "baseline": b_text,
+            "competitor": c_text,
+            "status": "Warning" if gap else "Optimized"
+        })
+
+    return {
+        "overall_score": f"{int(baseline.overall_score)}/100",
+        "competitor_score": f"{int(competitor.overall_score)}/100",
+        "gaps": str(gaps_count),
+        "techDebt": "High" if (baseline.technical.page_load_time or 0.0) > 3.0 or gaps_count > 3 else "Low",
+        "categories": get_cat_scores(baseline),
+        "comp_categories": get_cat_scores(competitor),
+        "details": details,
+        "baseline_url": baseline.url,
+        "competitor_url": competitor.url,
+    }
+
 
 @router.get("/baseline")
 async def get_baseline():
@@ -19,7 +163,7 @@ async def get_baseline():
     Returns the stored baseline SEO data for Bajaj Life.
     """
     try:
-        baseline = extractor_service.get_baseline_data()
+        baseline = await asyncio.to_thread(extractor_service.get_baseline_data)
         return baseline.model_dump()
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -30,11 +174,11 @@ async def extract_baseline(url: str = "https://www.bajajlifeinsurance.com/"):
     Directly extracts baseline SEO data for Bajaj Life.
     """
     try:
-        from services.crawler_service import CrawlerService
         crawler = CrawlerService()
         pages = await crawler.crawl(url)
         data = await extractor_service.extract_full_site_data(url, pages)
         save_path = await extractor_service.save_baseline(data)
+        await cache_service.invalidate_all()
         return {"status": "success", "message": "Baseline extraction completed.", "path": save_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Extraction error: {str(e)}")
@@ -45,184 +189,115 @@ async def extract_competitor(url: str):
     Directly extracts competitor SEO data.
     """
     try:
-        from services.crawler_service import CrawlerService
         crawler = CrawlerService()
         pages = await crawler.crawl(url)
         data = await extractor_service.extract_full_site_data(url, pages)
         save_path = await extractor_service.save_competitor(data)
+        await cache_service.invalidate_competitor(save_path)
         return {"status": "success", "message": f"Extraction for {url} completed.", "path": save_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Extraction error: {str(e)}")
 
 
-@router.get("/compare")
+async def build_comparison_async(baseline: FullSEOResult, competitor: FullSEOResult) -> Dict[str, Any]:
+    """
+    Full comparison report including the AI summary.
+    """
+    # AI summary is network-bound; let it run while the table is built
+    ai_task = asyncio.create_task(ai_service.compare_seo_data(baseline, competitor))
+    result = build_comparison(baseline, competitor)
+    result["ai_analysis"] = await ai_task
+    return result
+
+
+async def _compare_one(baseline: FullSEOResult, baseline_mtime_ns: int, competitor_url: str) -> bytes:
+    """
+    Compares the baseline with one competitor and returns the rendered JSON
+    report, served from the Redis cache when an identical comparison exists.
+    """
+    comp_path = extractor_service.competitor_path(competitor_url)
+    comp_mtime_ns = await asyncio.to_thread(extractor_service.competitor_mtime_ns, comp_path)
+    cache_key = cache_service.comparison_key(baseline_mtime_ns, comp_path, comp_mtime_ns)
+    cached = await cache_service.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Use stored competitor data if it exists
+    try:
+        competitor = await asyncio.to_thread(extractor_service.get_competitor_data, comp_path)
+    except FileNotFoundError:
+        # Extract on the fly
+        crawler = CrawlerService()
+        pages = await crawler.crawl(competitor_url)
+        competitor = await extractor_service.extract_full_site_data(competitor_url, pages)
+        await extractor_service.save_competitor(competitor)
+        # Key the report to the file just written, so the next request finds it
+        comp_mtime_ns = await asyncio.to_thread(extractor_service.competitor_mtime_ns, comp_path)
+        cache_key = cache_service.comparison_key(baseline_mtime_ns, comp_path, comp_mtime_ns)
+
+    result = await build_comparison_async(baseline, competitor)
+
+    body = orjson.dumps(result)
+    # A fallback summary means the AI call failed; serve it but let the next request retry
+    if result["ai_analysis"] not in COMPARE_FALLBACKS:
+        await cache_service.set(cache_key, body)
+    return body
+
+
+@router.get("/compare", response_model=ComparisonResponse, response_class=ORJSONResponse)
 async def compare_sites(competitor_url: str = Query(...)):
     """
     Compares Bajaj Life (baseline) with a competitor.
     Returns detailed audit breakdown and scores for visualization.
     """
     try:
-        baseline = extractor_service.get_baseline_data()
-        
-        # Check if competitor data exists
-        domain = re.sub(r'\W+', '_', competitor_url.replace("https://", "").replace("http://", "").rstrip("/"))
-        comp_path = os.path.join(settings.COMPETITOR_DIR, f"{domain}_seo.json")
-        
-        if os.path.exists(comp_path):
-            with open(comp_path, "r") as f:
-                competitor = FullSEOResult.model_validate_json(f.read())
-        else:
-            # Extract on the fly
-            from services.crawler_service import CrawlerService
-            crawler = CrawlerService()
-            pages = await crawler.crawl(competitor_url)
-            competitor = await extractor_service.extract_full_site_data(competitor_url, pages)
-            await extractor_service.save_competitor(competitor)
-
-        # Build detailed comparison
-        b = baseline.model_dump(mode='json')
-        c = competitor.model_dump(mode='json')
-
-        
-        # Categorical scores for Radar Chart
-        def get_cat_scores(data):
-            def safe_get(d, keys, default=0):
-                for k in keys:
-                    d = d.get(k, {}) if isinstance(d, dict) else {}
-                return d if isinstance(d, (int, float, bool)) else default
-
-            # Strict scoring: normalized to 0-100 with None safety
-            plt = safe_get(data, ["technical", "page_load_time"], 3.0)
-            rds = safe_get(data, ["content", "readability_score"], 0.7)
-            mss = safe_get(data, ["mobile", "mobile_speed_score"], 70)
-            da = safe_get(data, ["domain_authority", "domain_authority"], 50)
-            
-            tech_score = max(0, 100 - (float(plt) * 20))
-            content_score = float(rds) * 100
-            
-            # Trust score calculation with safe boolean checks
-            is_irdai = safe_get(data, ["ymyl", "irdai_registration"], False)
-            is_claim = safe_get(data, ["ymyl", "claim_settlement_ratio"], False)
-            trust_score = 100 if is_irdai and is_claim else 60
-            
-            mobile_score = float(mss)
-            auth_score = float(da)
-            
-            return {
-                "Technical": round(tech_score, 1),
-                "Content": round(content_score, 1),
-                "Trust (YMYL)": round(float(trust_score), 1),
-                "Mobile": round(mobile_score, 1),
-                "Authority": round(auth_score, 1)
-            }
-
-        categories = get_cat_scores(b)
-        comp_categories = get_cat_scores(c)
-
-        # Detailed parameters for table with strict logic
-        details = []
-        params_to_compare = [
-            # 1. Domain
-            ("Domain Authority", float(b["domain_authority"].get("domain_authority") or 0), float(c["domain_authority"].get("domain_authority") or 0), "/100"),
-            ("Backlinks", int(b["domain_authority"].get("total_backlinks") or 0), int(c["domain_authority"].get("total_backlinks") or 0), ""),
-            ("Referring Domains", int(b["domain_authority"].get("referring_domains") or 0), int(c["domain_authority"].get("referring_domains") or 0), ""),
-            ("Organic Keywords", int(b["domain_authority"].get("organic_keywords") or 0), int(c["domain_authority"].get("organic_keywords") or 0), ""),
-            ("HTTPS Secured", bool(b["domain_authority"].get("https_status")), bool(c["domain_authority"].get("https_status")), "bool"),
-
-            # 2. Crawlability
-            ("Robots.txt", bool(b["crawlability"].get("robots_txt_exists")), bool(c["crawlability"].get("robots_txt_exists")), "bool"),
-            ("XML Sitemap", bool(b["crawlability"].get("xml_sitemap_exists")), bool(c["crawlability"].get("xml_sitemap_exists")), "bool"),
-            ("Orphan Pages", int(b["crawlability"].get("orphan_pages") or 0), int(c["crawlability"].get("orphan_pages") or 0), ""),
-            ("Crawl Depth", int(b["crawlability"].get("crawl_depth") or 0), int(c["crawlability"].get("crawl_depth") or 0), ""),
-            
-            # 3. Content 
-            ("Avg Word Count", int(b["content"].get("avg_word_count") or 0), int(c["content"].get("avg_word_count") or 0), " words"),
-            ("Thin Content Ratio", float(b["content"].get("thin_content_ratio") or 0), float(c["content"].get("thin_content_ratio") or 0), "%"),
-            ("Readability Score", float(b["content"].get("readability_score") or 0), float(c["content"].get("readability_score") or 0), "/1.0"),
-            ("FAQ Presence", bool(b["content"].get("faq_presence")), bool(c["content"].get("faq_presence")), "bool"),
-
-            # 4. YMYL & Trust (Critical)
-            ("IRDAI Reg. Display", bool(b["ymyl"].get("irdai_registration")), bool(c["ymyl"].get("irdai_registration")), "bool"),
-            ("Claim Settlement Ratio", bool(b["ymyl"].get("claim_settlement_ratio")), bool(c["ymyl"].get("claim_settlement_ratio")), "bool"),
-            ("Risk Disclaimer", bool(b["ymyl"].get("risk_disclaimer")), bool(c["ymyl"].get("risk_disclaimer")), "bool"),
-            ("Privacy Policy", bool(b["ymyl"].get("privacy_policy_quality")), bool(c["ymyl"].get("privacy_policy_quality")), "bool"),
-            ("Contact/Grievance", bool(b["ymyl"].get("contact_grievance_info")), bool(c["ymyl"].get("contact_grievance_info")), "bool"),
-
-            # 5. Technical
-            ("Page Load Time", float(b["technical"].get("page_load_time") or 0), float(c["technical"].get("page_load_time") or 0), "s"),
-            ("TTFB", float(b["technical"].get("ttfb") or 0), float(c["technical"].get("ttfb") or 0), "ms"),
-            ("LCP Score", float(b["technical"].get("lcp_score") or 0), float(c["technical"].get("lcp_score") or 0), "s"),
-            ("CLS Score", float(b["technical"].get("cls_score") or 0), float(c["technical"].get("cls_score") or 0), ""),
-            ("JS Bundle Size", float(b["technical"].get("js_bundle_weight") or 0), float(c["technical"].get("js_bundle_weight") or 0), "KB"),
-            
-            # 6. Mobile
-            ("Mobile Responsiveness", bool(b["mobile"].get("mobile_responsive")), bool(c["mobile"].get("mobile_responsive")), "bool"),
-            ("Mobile Speed Score", float(b["mobile"].get("mobile_speed_score") or 0), float(c["mobile"].get("mobile_speed_score") or 0), "/100"),
-            ("Tap Target Spacing", bool(b["mobile"].get("tap_element_spacing")), bool(c["mobile"].get("tap_element_spacing")), "bool"),
-
-            # 7. India Specific
-            ("INR Currency Use", bool(b["india_specific"].get("inr_currency_use")), bool(c["india_specific"].get("inr_currency_use")), "bool"),
-            ("Tax Keywords (80C)", bool(b["india_specific"].get("india_tax_keywords")), bool(c["india_specific"].get("india_tax_keywords")), "bool"),
-            ("Hreflang en-IN", bool(b["india_specific"].get("hreflang_en_in")), bool(c["india_specific"].get("hreflang_en_in")), "bool"),
-            
-            # 8. Schema
-            ("Organization Schema", bool(b["schema_data"].get("organization_schema")), bool(c["schema_data"].get("organization_schema")), "bool"),
-            ("Product/Plan Schema", bool(b["schema_data"].get("product_schema")), bool(c["schema_data"].get("product_schema")), "bool"),
-            ("FAQ Schema", bool(b["schema_data"].get("faq_schema")), bool(c["schema_data"].get("faq_schema")), "bool"),
-
-            # 9. Meta Signals
-            ("Title Tag Optimized", bool(b["meta_html"].get("title_length_optimized")), bool(c["meta_html"].get("title_length_optimized")), "bool"),
-            ("Meta Desc Presence", bool(b["meta_html"].get("meta_desc_presence")), bool(c["meta_html"].get("meta_desc_presence")), "bool"),
-            ("H1 Hierarchy Valid", bool(b["meta_html"].get("heading_hierarchy_valid")), bool(c["meta_html"].get("heading_hierarchy_valid")), "bool"),
-            ("Img Alt Coverage", float(b["meta_html"].get("image_alt_coverage") or 0), float(c["meta_html"].get("image_alt_coverage") or 0), "%"),
-        ]
-
-        
-        gaps_count = 0
-        for label, bv, cv, unit in params_to_compare:
-            status = "Optimized"
-            if isinstance(bv, (int, float)) and isinstance(cv, (int, float)):
-                if label == "Page Load Time" or label == "Thin Content Ratio":
-                    if bv > cv: 
-                        status = "Warning"
-                        gaps_count += 1
-                else:
-                    if bv < cv: 
-                        status = "Warning"
-                        gaps_count += 1
-            elif isinstance(bv, bool) and isinstance(cv, bool):
-                if not bv and cv: 
-                    status = "Warning"
-                    gaps_count += 1
-            
-            details.append({
-                "label": label,
-                "baseline": f"{bv}{unit}" if unit != "bool" else ("Yes" if bv else "No"),
-                "competitor": f"{cv}{unit}" if unit != "bool" else ("Yes" if cv else "No"),
-                "status": status
-            })
-
-        from services.ai_service import AIService
-        ai_summary = await AIService().compare_seo_data(b, c)
-
-        return {
-            "overall_score": f"{int(baseline.overall_score)}/100",
-            "competitor_score": f"{int(competitor.overall_score)}/100",
-            "gaps": str(gaps_count),
-            "techDebt": "High" if (baseline.technical.page_load_time or 0.0) > 3.0 or gaps_count > 3 else "Low",
-            "categories": categories,
-            "comp_categories": comp_categories,
-            "details": details,
-            "baseline_url": baseline.url,
-            "competitor_url": competitor.url,
-            "ai_analysis": ai_summary
-        }
+        baseline_mtime_ns = await asyncio.to_thread(extractor_service.baseline_mtime_ns)
+        baseline = await asyncio.to_thread(extractor_service.get_baseline_data)
+        body = await _compare_one(baseline, baseline_mtime_ns, competitor_url)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
 
 
+@router.post("/compare/batch", response_class=ORJSONResponse)
+async def compare_sites_batch(request: BatchCompareRequest):
+    """
+    Compares Bajaj Life (baseline) with several competitors in one call.
+    The baseline is loaded once and the competitors are processed concurrently.
+    Returns one report per URL, in request order; failed comparisons carry an "error" instead.
+    """
+    try:
+        baseline_mtime_ns = await asyncio.to_thread(extractor_service.baseline_mtime_ns)
+        baseline = await asyncio.to_thread(extractor_service.get_baseline_data)
+        # URLs sharing a stored result (duplicates, same host) are compared once, so
+        # concurrent crawls never race to write the same competitor file
+        paths = [extractor_service.competitor_path(url) for url in request.competitor_urls]
+        unique = {}
+        for path, url in zip(paths, request.competitor_urls):
+            unique.setdefault(path, url)
+        outcomes = await asyncio.gather(
+            *(_compare_one(baseline, baseline_mtime_ns, url) for url in unique.values()),
+            return_exceptions=True
+        )
+        by_path = dict(zip(unique, outcomes))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
+
+    reports = []
+    for url, path in zip(request.competitor_urls, paths):
+        outcome = by_path[path]
+        if isinstance(outcome, Exception):
+            print(f"Batch comparison failed for {url}: {outcome}")
+            outcome = orjson.dumps({"competitor_url": url, "error": f"Comparison failed: {str(outcome)}"})
+        reports.append(outcome)
+    # Reports are already encoded, so splice them instead of re-serialising
+    return Response(content=b"[" + b",".join(reports) + b"]", media_type="application/json")
+
+
 
 @router.get("/results/{competitor_domain}")
 async def get_comparison_report(competitor_domain: str):
@@ -230,7 +305,7 @@ async def get_comparison_report(competitor_domain: str):
     Returns the JSON report for a specific comparison.
     """
     try:
-        baseline = extractor_service.get_baseline_data()
+        baseline = await asyncio.to_thread(extractor_service.get_baseline_data)
         return baseline.model_dump()
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Baseline not found.")
@@ -243,157 +318,34 @@ async def compare_sites_stream(competitor_url: str = Query(...)):
     """
     async def event_generator():
         try:
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Starting analysis...'})}\n\n"
+            yield SSE_STARTING
             
-            baseline = extractor_service.get_baseline_data()
+            baseline = await asyncio.to_thread(extractor_service.get_baseline_data)
             
             # Extract on the fly
-            from services.crawler_service import CrawlerService
             crawler = CrawlerService()
             
             pages = []
-            yield f"data: {json.dumps({'type': 'status', 'message': f'Crawling {competitor_url}...'})}\n\n"
+            yield sse({'type': 'status', 'message': f'Crawling {competitor_url}...'})
             
             async for page in crawler.crawl_stream(competitor_url):
                 pages.append(page)
-                yield f"data: {json.dumps({'type': 'log', 'url': page['url'], 'status': page['status'], 'depth': page.get('depth', 0)})}\n\n"
+                yield sse({'type': 'log', 'url': page['url'], 'status': page['status'], 'depth': page.get('depth', 0)})
             
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Analyzing content (100+ parameters)...'})}\n\n"
+            yield SSE_ANALYZING
             competitor = await extractor_service.extract_full_site_data(competitor_url, pages)
-            await extractor_service.save_competitor(competitor)
+            save_path = await extractor_service.save_competitor(competitor)
+            await cache_service.invalidate_competitor(save_path)
 
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Generating comparison report...'})}\n\n"
+            yield SSE_REPORTING
             
-            # Build detailed comparison
-            b = baseline.model_dump(mode='json')
-            c = competitor.model_dump(mode='json')
-
-            # Categorical scores (Same logic as compare_sites)
-            def get_cat_scores(data):
-                def safe_get(d, keys, default=0):
-                    for k in keys:
-                        d = d.get(k, {}) if isinstance(d, dict) else {}
-                    return d if isinstance(d, (int, float, bool)) else default
-
-                plt = safe_get(data, ["technical", "page_load_time"], 3.0)
-                rds = safe_get(data, ["content", "readability_score"], 0.7)
-                mss = safe_get(data, ["mobile", "mobile_speed_score"], 70)
-                da = safe_get(data, ["domain_authority", "domain_authority"], 50)
-                
-                tech_score = max(0, 100 - (float(plt) * 20))
-                content_score = float(rds) * 100
-                
-                is_irdai = safe_get(data, ["ymyl", "irdai_registration"], False)
-                is_claim = safe_get(data, ["ymyl", "claim_settlement_ratio"], False)
-                trust_score = 100 if is_irdai and is_claim else 60
-                
-                mobile_score = float(mss)
-                auth_score = float(da)
-                
-                return {
-                    "Technical": round(tech_score, 1),
-                    "Content": round(content_score, 1),
-                    "Trust (YMYL)": round(float(trust_score), 1),
-                    "Mobile": round(mobile_score, 1),
-                    "Authority": round(auth_score, 1)
-                }
-
-            categories = get_cat_scores(b)
-            comp_categories = get_cat_scores(c)
-
-            # Detailed parameters for table with strict logic
-            details = []
-            params_to_compare = [
-                ("Domain Authority", float(b["domain_authority"].get("domain_authority") or 0), float(c["domain_authority"].get("domain_authority") or 0), "/100"),
-                ("Backlinks", int(b["domain_authority"].get("total_backlinks") or 0), int(c["domain_authority"].get("total_backlinks") or 0), ""),
-                ("Referring Domains", int(b["domain_authority"].get("referring_domains") or 0), int(c["domain_authority"].get("referring_domains") or 0), ""),
-                ("Organic Keywords", int(b["domain_authority"].get("organic_keywords") or 0), int(c["domain_authority"].get("organic_keywords") or 0), ""),
-                ("HTTPS Secured", bool(b["domain_authority"].get("https_status")), bool(c["domain_authority"].get("https_status")), "bool"),
-
-                ("Robots.txt", bool(b["crawlability"].get("robots_txt_exists")), bool(c["crawlability"].get("robots_txt_exists")), "bool"),
-                ("XML Sitemap", bool(b["crawlability"].get("xml_sitemap_exists")), bool(c["crawlability"].get("xml_sitemap_exists")), "bool"),
-                ("Orphan Pages", int(b["crawlability"].get("orphan_pages") or 0), int(c["crawlability"].get("orphan_pages") or 0), ""),
-                ("Crawl Depth", int(b["crawlability"].get("crawl_depth") or 0), int(c["crawlability"].get("crawl_depth") or 0), ""),
-                
-                ("Avg Word Count", int(b["content"].get("avg_word_count") or 0), int(c["content"].get("avg_word_count") or 0), " words"),
-                ("Thin Content Ratio", float(b["content"].get("thin_content_ratio") or 0), float(c["content"].get("thin_content_ratio") or 0), "%"),
-                ("Readability Score", float(b["content"].get("readability_score") or 0), float(c["content"].get("readability_score") or 0), "/1.0"),
-                ("FAQ Presence", bool(b["content"].get("faq_presence")), bool(c["content"].get("faq_presence")), "bool"),
-
-                ("IRDAI Reg. Display", bool(b["ymyl"].get("irdai_registration")), bool(c["ymyl"].get("irdai_registration")), "bool"),
-                ("Claim Settlement Ratio", bool(b["ymyl"].get("claim_settlement_ratio")), bool(c["ymyl"].get("claim_settlement_ratio")), "bool"),
-                ("Risk Disclaimer", bool(b["ymyl"].get("risk_disclaimer")), bool(c["ymyl"].get("risk_disclaimer")), "bool"),
-                ("Privacy Policy", bool(b["ymyl"].get("privacy_policy_quality")), bool(c["ymyl"].get("privacy_policy_quality")), "bool"),
-                ("Contact/Grievance", bool(b["ymyl"].get("contact_grievance_info")), bool(c["ymyl"].get("contact_grievance_info")), "bool"),
-
-                ("Page Load Time", float(b["technical"].get("page_load_time") or 0), float(c["technical"].get("page_load_time") or 0), "s"),
-                ("TTFB", float(b["technical"].get("ttfb") or 0), float(c["technical"].get("ttfb") or 0), "ms"),
-                ("LCP Score", float(b["technical"].get("lcp_score") or 0), float(c["technical"].get("lcp_score") or 0), "s"),
-                ("CLS Score", float(b["technical"].get("cls_score") or 0), float(c["technical"].get("cls_score") or 0), ""),
-                ("JS Bundle Size", float(b["technical"].get("js_bundle_weight") or 0), float(c["technical"].get("js_bundle_weight") or 0), "KB"),
-                
-                ("Mobile Responsiveness", bool(b["mobile"].get("mobile_responsive")), bool(c["mobile"].get("mobile_responsive")), "bool"),
-                ("Mobile Speed Score", float(b["mobile"].get("mobile_speed_score") or 0), float(c["mobile"].get("mobile_speed_score") or 0), "/100"),
-                ("Tap Target Spacing", bool(b["mobile"].get("tap_element_spacing")), bool(c["mobile"].get("tap_element_spacing")), "bool"),
-
-                ("INR Currency Use", bool(b["india_specific"].get("inr_currency_use")), bool(c["india_specific"].get("inr_currency_use")), "bool"),
-                ("Tax Keywords (80C)", bool(b["india_specific"].get("india_tax_keywords")), bool(c["india_specific"].get("india_tax_keywords")), "bool"),
-                ("Hreflang en-IN", bool(b["india_specific"].get("hreflang_en_in")), bool(c["india_specific"].get("hreflang_en_in")), "bool"),
-                
-                ("Organization Schema", bool(b["schema_data"].get("organization_schema")), bool(c["schema_data"].get("organization_schema")), "bool"),
-                ("Product/Plan Schema", bool(b["schema_data"].get("product_schema")), bool(c["schema_data"].get("product_schema")), "bool"),
-                ("FAQ Schema", bool(b["schema_data"].get("faq_schema")), bool(c["schema_data"].get("faq_schema")), "bool"),
-
-                ("Title Tag Optimized", bool(b["meta_html"].get("title_length_optimized")), bool(c["meta_html"].get("title_length_optimized")), "bool"),
-                ("Meta Desc Presence", bool(b["meta_html"].get("meta_desc_presence")), bool(c["meta_html"].get("meta_desc_presence")), "bool"),
-                ("H1 Hierarchy Valid", bool(b["meta_html"].get("heading_hierarchy_valid")), bool(c["meta_html"].get("heading_hierarchy_valid")), "bool"),
-                ("Img Alt Coverage", float(b["meta_html"].get("image_alt_coverage") or 0), float(c["meta_html"].get("image_alt_coverage") or 0), "%"),
-            ]
-
-            gaps_count = 0
-            for label, bv, cv, unit in params_to_compare:
-                status = "Optimized"
-                if isinstance(bv, (int, float)) and isinstance(cv, (int, float)):
-                    if label == "Page Load Time" or label == "Thin Content Ratio":
-                        if bv > cv: 
-                            status = "Warning"
-                            gaps_count += 1
-                    else:
-                        if bv < cv: 
-                            status = "Warning"
-                            gaps_count += 1
-                elif isinstance(bv, bool) and isinstance(cv, bool):
-                    if not bv and cv: 
-                        status = "Warning"
-                        gaps_count += 1
-                
-                details.append({
-                    "label": label,
-                    "baseline": f"{bv}{unit}" if unit != "bool" else ("Yes" if bv else "No"),
-                    "competitor": f"{cv}{unit}" if unit != "bool" else ("Yes" if cv else "No"),
-                    "status": status
-                })
-
-            from services.ai_service import AIService
-            ai_summary = await AIService().compare_seo_data(b, c)
-
-            result = {
-                "overall_score": f"{int(baseline.overall_score)}/100",
-                "competitor_score": f"{int(competitor.overall_score)}/100",
-                "gaps": str(gaps_count),
-                "techDebt": "High" if (baseline.technical.page_load_time or 0.0) > 3.0 or gaps_count > 3 else "Low",
-                "categories": categories,
-                "comp_categories": comp_categories,
-                "details": details,
-                "baseline_url": baseline.url,
-                "competitor_url": competitor.url,
-                "ai_analysis": ai_summary
-            }
-            yield f"data: {json.dumps({'type': 'result', 'data': result})}\n\n"
+            result = await build_comparison_async(baseline, competitor)
+
+            yield sse({'type': 'result', 'data': result})
             
         except Exception as e:
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield sse({'type': 'error', 'message': str(e)})
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
@@ -21,6 +21,7 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
+    COMPARE_CACHE_TTL: int = 3600  # Seconds a rendered /compare response is reused
     
     # Paths
     DATA_DIR: str = "/app/data"
@@ -31,10 +32,16 @@ class Settings(BaseSettings):
     # Crawler
     MAX_CRAWL_DEPTH: int = 10
     MAX_PAGES: int = 1000  # Increased limit for full site crawl
+    CRAWL_CONCURRENCY: int = 4  # Pages fetched in parallel per crawl wave
+    EXTRACT_WORKERS: int = 4  # Processes parsing crawled pages; bounded so containers don't fork per host core
+    CRAWL_CACHE_DIR: str = "/app/data/crawl_cache"  # Per-page checkpoints for resumable crawls
+    CRAWL_CACHE_TTL: int = 86400  # Seconds a checkpointed page is reused on resume
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
     
     # AI Analysis
     GROQ_API_KEY: Optional[str] = None
+    AI_CACHE_TTL: int = 1800  # Seconds an identical prompt reuses the previous Groq answer
+    AI_CACHE_SIZE: int = 256  # Most recent prompts kept in memory by the shared AIService
     
     # LangSmith Tracing
     LANGCHAIN_TRACING_V2: bool = False
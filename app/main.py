@@ -1,10 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
 from core.config import settings
 from api.endpoints import router as api_router
+from services.extractor_service import shutdown_parse_pool
+
+
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip for regular responses only. Server-Sent Events are passed through
+    untouched, since a gzip stream would hold events back until it flushes.
+    """
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "text/event-stream" in Headers(scope=scope).get("accept", ""):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Parse workers are separate processes; stop them with the server
+    shutdown_parse_pool()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     description="Production-grade SEO Comparison Engine for Bajaj Life vs Competitors"
 )
@@ -18,6 +43,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress the JSON comparison payloads (repetitive labels/status strings)
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1024)
+
 # Include API Router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -3,16 +3,11 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
-class SEOParameter(BaseModel):
+class SEOBaseModel(BaseModel):
+    # Shared config for every extracted-result model; stored JSON may carry retired fields
     model_config = ConfigDict(extra="ignore")
-    name: str
-    value: Any
-    score: float = 0.0
-    status: str = "unknown" # leading, lagging, equal
-    details: Optional[str] = None
 
-class DomainAuthority(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class DomainAuthority(SEOBaseModel):
     domain_age: Optional[float] = None
     domain_authority: Optional[float] = None
     total_backlinks: Optional[int] = None
@@ -24,8 +19,7 @@ class DomainAuthority(BaseModel):
     https_status: bool = False
     ssl_validity: bool = False
 
-class CrawlabilityIndexing(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class CrawlabilityIndexing(SEOBaseModel):
     robots_txt_exists: bool = False
     xml_sitemap_exists: bool = False
     sitemap_validity: bool = False
@@ -37,8 +31,7 @@ class CrawlabilityIndexing(BaseModel):
     parameterized_urls: int = 0
     crawl_budget_waste: float = 0.0
 
-class URLStructure(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class URLStructure(SEOBaseModel):
     url_readability_score: float = 0.0
     keyword_in_url: bool = False
     url_length_consistency: bool = True
@@ -48,8 +41,7 @@ class URLStructure(BaseModel):
     www_vs_non_www: bool = True
     static_vs_dynamic_ratio: float = 1.0
 
-class MetaHTMLSignals(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class MetaHTMLSignals(SEOBaseModel):
     title_presence: bool = False
     title_length_optimized: bool = False
     duplicate_titles: int = 0
@@ -60,8 +52,7 @@ class MetaHTMLSignals(BaseModel):
     heading_hierarchy_valid: bool = True
     image_alt_coverage: float = 0.0
 
-class ContentQuality(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class ContentQuality(SEOBaseModel):
     avg_word_count: int = 0
     thin_content_ratio: float = 0.0
     duplicate_content_signals: float = 0.0
@@ -71,16 +62,14 @@ class ContentQuality(BaseModel):
     blog_volume: int = 0
     update_frequency: str = "unknown"
 
-class SearchIntent(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class SearchIntent(SEOBaseModel):
     informational_pages: int = 0
     transactional_pages: int = 0
     intent_alignment_score: float = 0.0
     topic_depth: float = 0.0
     featured_snippet_ready: bool = False
 
-class YMYLTrust(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class YMYLTrust(SEOBaseModel):
     irdai_registration: bool = False
     legal_details: bool = False
     claim_settlement_ratio: bool = False
@@ -90,8 +79,7 @@ class YMYLTrust(BaseModel):
     contact_grievance_info: bool = False
     physical_address: bool = False
 
-class EEATSignals(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class EEATSignals(SEOBaseModel):
     author_presence: bool = False
     author_bio: bool = False
     expertise_indicators: bool = False
@@ -99,8 +87,7 @@ class EEATSignals(BaseModel):
     leadership_transparency: bool = False
     awards_certifications: bool = False
 
-class TechnicalPerformance(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class TechnicalPerformance(SEOBaseModel):
     lcp_score: Optional[float] = 0.0
     cls_score: Optional[float] = 0.0
     page_load_time: Optional[float] = 0.0
@@ -110,8 +97,7 @@ class TechnicalPerformance(BaseModel):
     image_optimization: Optional[float] = 0.0
     lazy_loading: bool = False
 
-class MobileUX(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class MobileUX(SEOBaseModel):
     mobile_responsive: bool = False
     viewport_config: bool = False
     tap_element_spacing: bool = False
@@ -119,16 +105,14 @@ class MobileUX(BaseModel):
     form_ux_complexity: str = "medium"
     calculator_usability: bool = False
 
-class Linking(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class Linking(SEOBaseModel):
     internal_linking_density: float = 0.0
     anchor_text_diversity: float = 0.0
     orphan_money_pages: int = 0
     contextual_vs_footer_ratio: float = 0.0
     external_authority_links: int = 0
 
-class SchemaStructuredData(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class SchemaStructuredData(SEOBaseModel):
     organization_schema: bool = False
     product_schema: bool = False
     faq_schema: bool = False
@@ -136,30 +120,26 @@ class SchemaStructuredData(BaseModel):
     review_schema: bool = False
     schema_validation_errors: int = 0
 
-class IndiaSpecific(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class IndiaSpecific(SEOBaseModel):
     inr_currency_use: bool = False
     india_tax_keywords: bool = False
     hreflang_en_in: bool = False
     localized_content_relevance: float = 0.0
 
-class HealthErrors(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class HealthErrors(SEOBaseModel):
     error_404_count: int = 0
     redirect_chains: int = 0
     broken_links: int = 0
     simulated_index_errors: int = 0
 
-class BrandUX(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class BrandUX(SEOBaseModel):
     structured_nav_clarity: bool = False
     cta_optimization: bool = False
     content_freshness: bool = False
 
-class FullSEOResult(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class FullSEOResult(SEOBaseModel):
     url: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime  # Set once by the producer, in UTC
     domain_authority: DomainAuthority
     crawlability: CrawlabilityIndexing
     url_structure: URLStructure
@@ -178,13 +158,33 @@ class FullSEOResult(BaseModel):
     overall_score: float = 0.0
     ai_insights: Optional[Dict[str, Any]] = None
 
-class ComparisonResult(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+class ComparisonResult(SEOBaseModel):
     baseline_url: str
     competitor_url: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime  # Set once by the producer, in UTC
     gaps: List[Dict[str, Any]]
     scores: Dict[str, float]
     overall_grade: float
     summary: str
     ai_analysis: Optional[str] = None
+
+class ComparisonDetail(BaseModel):
+    label: str
+    baseline: str
+    competitor: str
+    status: str # Optimized, Warning
+
+class ComparisonResponse(BaseModel):
+    overall_score: str
+    competitor_score: str
+    gaps: str
+    techDebt: str
+    categories: Dict[str, float]
+    comp_categories: Dict[str, float]
+    details: List[ComparisonDetail]
+    baseline_url: str
+    competitor_url: str
+    ai_analysis: Optional[str] = None
+
+class BatchCompareRequest(BaseModel):
+    competitor_urls: List[str] = Field(..., min_length=1, max_length=10)
@@ -1,4 +1,5 @@
 
+import argparse
 import asyncio
 import os
 import sys
@@ -10,12 +11,20 @@ from services.crawler_service import CrawlerService
 from services.extractor_service import ExtractorService
 from core.config import settings
 
-async def main():
+async def main(force: bool = False):
     url = "https://www.bajajlifeinsurance.com/"
     print(f"Starting baseline regeneration for {url}...")
     print(f"Config: Max Depth={settings.MAX_CRAWL_DEPTH}, Max Pages={settings.MAX_PAGES}")
     
-    crawler = CrawlerService()
+    # Pages are checkpointed as they are crawled, so a failed run resumes instead of recrawling
+    crawler = CrawlerService(checkpoint_dir=os.path.join(settings.CRAWL_CACHE_DIR, "baseline"))
+    if force:
+        crawler.clear_checkpoint()
+    else:
+        restored = await asyncio.to_thread(crawler.load_checkpoint)
+        if restored:
+            print(f"Resuming from checkpoint with {restored} pages already crawled.")
+
     pages = await crawler.crawl(url) # This uses the wrapper which calls crawl_stream internally
     print(f"Crawled {len(pages)} pages.")
     
@@ -34,4 +43,7 @@ async def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Crawl the baseline site and regenerate its SEO data.")
+    parser.add_argument("--force", action="store_true", help="Ignore crawl checkpoints and recrawl every page")
+    args = parser.parse_args()
+    asyncio.run(main(force=args.force))
@@ -1,25 +1,18 @@
-import json
-from groq import AsyncGroq
+import orjson
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from langsmith import traceable
 
 from core.config import settings
-from typing import Dict, Any, List
+from models.seo import FullSEOResult
+from utils.html import parse_html
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 
-class AIService:
-    def __init__(self):
-        self.client = AsyncGroq(api_key=settings.GROQ_API_KEY) if settings.GROQ_API_KEY else None
-        self.model = "llama-3.3-70b-versatile"
-
-
-    @traceable(name="analyze_seo_content", run_type="llm", metadata={"model": "llama-3.3-70b-versatile"})
-    async def analyze_seo_content(self, html_content: str, url: str) -> Dict[str, Any]:
-        """
-        Extracts SEO signals from HTML content using Groq AI.
-        """
-        if not self.client:
-            return {}
-
-        prompt = f"""
+# Prompt templates are built once at import; only the per-call data is formatted in
+ANALYZE_SYSTEM = "You are an expert SEO auditor specializing in enterprise and YMYL (Your Money Your Life) websites. You always respond with valid JSON."
+ANALYZE_PROMPT = """
         Analyze the following HTML content for SEO signals and return a JSON object.
         URL: {url}
         
@@ -30,8 +23,8 @@ class AIService:
         4. India Specific Context (references to Indian laws, currency, local contact)
         5. Brand/UX (visual clarity, primary CTA)
 
-        HTML Snapshot (truncated):
-        {html_content[:15000]}
+        Page Snapshot (title, meta description, headings and visible text; truncated):
+        {snapshot}
         
         Return ONLY valid JSON in this format:
         {{
@@ -61,42 +54,15 @@ class AIService:
         }}
         """
 
-        try:
-            chat_completion = await self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert SEO auditor specializing in enterprise and YMYL (Your Money Your Life) websites. You always respond with valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                model=self.model,
-                response_format={"type": "json_object"}
-            )
-            return json.loads(chat_completion.choices[0].message.content)
-        except Exception as e:
-            print(f"Error calling Groq API for extraction: {e}")
-            return {}
-
-    @traceable(name="compare_seo_data", run_type="llm", metadata={"model": "llama-3.3-70b-versatile", "task": "comparison"})
-    async def compare_seo_data(self, baseline_data: Dict[str, Any], competitor_data: Dict[str, Any]) -> str:
-        """
-        Generates a comparative analysis summary between baseline and competitor using AI.
-        """
-        if not self.client:
-            return "AI Analysis not available (Missing API Key)."
-
-        prompt = f"""
+COMPARE_SYSTEM = "You are a senior SEO consultant providing a competitive gap analysis for an insurance enterprise."
+COMPARE_PROMPT = """
         Compare the following SEO data of a baseline website (Bajaj Life) and a competitor.
         
         Baseline Data (Bajaj Life):
-        {json.dumps(baseline_data, indent=2, default=str)}
+        {baseline}
         
         Competitor Data:
-        {json.dumps(competitor_data, indent=2, default=str)}
+        {competitor}
 
         
         Provide a deep, enterprise-grade SEO gap analysis report in Markdown format.
@@ -128,12 +94,106 @@ class AIService:
         
         """
 
+# Summaries returned in place of a report when Groq is not configured or the call fails.
+# Callers must not cache these: the next attempt may succeed.
+COMPARE_UNAVAILABLE = "AI Analysis not available (Missing API Key)."
+COMPARE_FAILED = "Error generating AI comparison."
+COMPARE_FALLBACKS = frozenset({COMPARE_UNAVAILABLE, COMPARE_FAILED})
+
+
+def _page_signal(html_content: str, limit_bytes: int = 15000) -> str:
+    """
+    Reduces raw HTML to the parts an SEO audit reads: title, meta description,
+    headings and visible body text. Scripts, styles and markup are dropped so
+    the prompt budget is spent on content rather than boilerplate.
+    The result is capped at `limit_bytes` of UTF-8.
+    """
+    tree = parse_html(html_content)
+    if tree is None:
+        return ""
+
+    for el in tree.xpath("//script|//style|//noscript"):
+        el.drop_tree()
+
+    lines = []
+    title = tree.findtext(".//title")
+    if title and title.strip():
+        lines.append(f"Title: {title.strip()}")
+    for desc in tree.xpath("//meta[@name='description']/@content"):
+        lines.append(f"Meta description: {desc.strip()}")
+    for h in tree.xpath("//h1|//h2|//h3"):
+        text = " ".join(h.text_content().split())
+        if text:
+            lines.append(f"{h.tag.upper()}: {text}")
+
+    body = tree.find("body")
+    lines.append("Text: " + " ".join(" ".join((body if body is not None else tree).itertext()).split()))
+    # Budget in UTF-8 bytes so Devanagari pages get the same input size as English ones;
+    # a cut mid-character leaves only a partial trailing sequence, which "ignore" drops
+    return "\n".join(lines).encode("utf-8")[:limit_bytes].decode("utf-8", "ignore")
+
+
+class AIService:
+    def __init__(self):
+        self._client = None
+        self.model = "llama-3.3-70b-versatile"
+        # Exact-match LRU of Groq answers, keyed by a digest of the full prompt
+        self._cache: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+
+    @property
+    def client(self):
+        """
+        Groq client, created on first use so the SDK is only imported once an
+        AI call is actually made. None when no API key is configured.
+        """
+        if self._client is None and settings.GROQ_API_KEY:
+            from groq import AsyncGroq
+            self._client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+        return self._client
+
+    @staticmethod
+    def _prompt_key(prompt: str) -> bytes:
+        return hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: bytes, value: Any):
+        self._cache[key] = (time.monotonic() + settings.AI_CACHE_TTL, value)
+        self._cache.move_to_end(key)
+        if len(self._cache) > settings.AI_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+
+    @traceable(name="analyze_seo_content", run_type="llm", metadata={"model": "llama-3.3-70b-versatile"})
+    async def analyze_seo_content(self, html_content: str, url: str) -> Dict[str, Any]:
+        """
+        Extracts SEO signals from HTML content using Groq AI.
+        """
+        if not self.client:
+            return {}
+
+        prompt = ANALYZE_PROMPT.format(url=url, snapshot=_page_signal(html_content))
+
+        key = self._prompt_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         try:
             chat_completion = await self.client.chat.completions.create(
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a senior SEO consultant providing a competitive gap analysis for an insurance enterprise."
+                        "content": ANALYZE_SYSTEM
                     },
                     {
                         "role": "user",
@@ -141,9 +201,104 @@ class AIService:
                     }
                 ],
                 model=self.model,
+                response_format={"type": "json_object"}
             )
-            return chat_completion.choices[0].message.content
+            result = orjson.loads(chat_completion.choices[0].message.content)
+            self._cache_put(key, result)
+            return result
+        except Exception as e:
+            print(f"Error calling Groq API for extraction: {e}")
+            return {}
+
+    @traceable(name="compare_seo_data", run_type="llm", metadata={"model": "llama-3.3-70b-versatile", "task": "comparison"})
+    async def compare_seo_data(self, baseline: FullSEOResult, competitor: FullSEOResult) -> str:
+        """
+        Generates a comparative analysis summary between baseline and competitor using AI.
+        """
+        if not self.client:
+            return COMPARE_UNAVAILABLE
+
+        prompt = self._compare_prompt(baseline, competitor)
+
+        key = self._prompt_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            chat_completion = await self.client.chat.completions.create(
+                messages=self._compare_messages(prompt),
+                model=self.model,
+            )
+            summary = chat_completion.choices[0].message.content
+            self._cache_put(key, summary)
+            return summary
+        except Exception as e:
+            print(f"Error calling Groq API for comparison: {e}")
+            return COMPARE_FAILED
+
+    @traceable(name="compare_seo_data_stream", run_type="llm", metadata={"model": "llama-3.3-70b-versatile", "task": "comparison"})
+    async def compare_seo_data_stream(self, baseline: FullSEOResult, competitor: FullSEOResult) -> AsyncIterator[str]:
+        """
+        Streaming variant of compare_seo_data: yields the Markdown report in chunks
+        as Groq generates it. The assembled report is cached like the non-streaming call.
+        """
+        if not self.client:
+            yield COMPARE_UNAVAILABLE
+            return
+
+        prompt = self._compare_prompt(baseline, competitor)
+
+        key = self._prompt_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        try:
+            stream = await self.client.chat.completions.create(
+                messages=self._compare_messages(prompt),
+                model=self.model,
+                stream=True,
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
         except Exception as e:
             print(f"Error calling Groq API for comparison: {e}")
-            return "Error generating AI comparison."
+            yield COMPARE_FAILED
+            return
+
+        self._cache_put(key, "".join(parts))
+
+    @staticmethod
+    def _compare_prompt(baseline: FullSEOResult, competitor: FullSEOResult) -> str:
+        return COMPARE_PROMPT.format(
+            baseline=baseline.model_dump_json(indent=2),
+            competitor=competitor.model_dump_json(indent=2),
+        )
+
+    @staticmethod
+    def _compare_messages(prompt: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": COMPARE_SYSTEM
+            },
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ]
+
 
+@lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """
+    Process-wide AIService, so every caller shares one Groq client (and its
+    keep-alive connection pool) and one response cache.
+    """
+    return AIService()
@@ -0,0 +1,57 @@
+import hashlib
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from core.config import settings
+
+
+class CacheService:
+    """
+    Redis-backed cache for rendered comparison responses.
+    Redis being unavailable is treated as a cache miss, never as a failure.
+    """
+
+    def __init__(self, url: str = settings.REDIS_URL, ttl: int = settings.COMPARE_CACHE_TTL):
+        self.client = redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+        self.ttl = ttl
+
+    @staticmethod
+    def _digest(competitor: str) -> str:
+        return hashlib.sha1(competitor.encode()).hexdigest()
+
+    def comparison_key(self, baseline_mtime_ns: int, competitor: str, competitor_mtime_ns: int) -> str:
+        """
+        `competitor` is the competitor's data file path, so every URL that
+        resolves to the same stored result shares one cache entry. Its mtime
+        (0 while the file does not exist) retires entries when the file is rewritten.
+        """
+        return f"cmp:{baseline_mtime_ns}:{competitor_mtime_ns}:{self._digest(competitor)}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.get(key)
+        except RedisError as e:
+            print(f"Cache read skipped for {key}: {e}")
+            return None
+
+    async def set(self, key: str, value: bytes):
+        try:
+            await self.client.setex(key, self.ttl, value)
+        except RedisError as e:
+            print(f"Cache write skipped for {key}: {e}")
+
+    async def invalidate_competitor(self, competitor: str):
+        await self._delete_matching(f"cmp:*:{self._digest(competitor)}")
+
+    async def invalidate_all(self):
+        await self._delete_matching("cmp:*")
+
+    async def _delete_matching(self, pattern: str):
+        try:
+            keys = [key async for key in self.client.scan_iter(match=pattern)]
+            if keys:
+                await self.client.delete(*keys)
+        except RedisError as e:
+            print(f"Cache invalidation skipped for {pattern}: {e}")
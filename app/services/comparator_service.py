@@ -1,11 +1,52 @@
+from datetime import datetime, timezone
+from collections import defaultdict
 from typing import Any, Dict
 from models.seo import FullSEOResult, ComparisonResult
-from services.ai_service import AIService
+from services.ai_service import get_ai_service
+
+SECTIONS = ["content", "technical", "ymyl", "eeat", "mobile"]
+
+# Gap section label -> scoring section it counts towards (unlisted labels are unscored)
+SECTION_KEYS = {
+    "Content": "content",
+    "Technical": "technical",
+    "YMYL": "ymyl",
+    "E-E-A-T": "eeat",
+    "Mobile": "mobile",
+}
+
+
+def _cmp_num(b_val: Any, c_val: Any) -> str:
+    if c_val > b_val: return "leading"
+    if c_val < b_val: return "lagging"
+    return "equal"
+
+def _cmp_bool(b_val: bool, c_val: bool) -> str:
+    if c_val and not b_val: return "leading"
+    if b_val and not c_val: return "lagging"
+    return "equal"
+
+# Exact-type dispatch: bool is a subclass of int, so isinstance checks would treat flags as numbers
+_CMP = {bool: _cmp_bool, int: _cmp_num, float: _cmp_num}
+
+
+def check_gap(section: str, param: str, b_val: Any, c_val: Any) -> Dict[str, Any]:
+    # Only values of the same kind are compared (int and float share one); anything else is "equal"
+    cmp = _CMP.get(type(b_val))
+    status = cmp(b_val, c_val) if cmp is not None and _CMP.get(type(c_val)) is cmp else "equal"
+
+    return {
+        "section": section,
+        "parameter": param,
+        "baseline_value": b_val,
+        "competitor_value": c_val,
+        "status": status
+    }
 
 
 class ComparatorService:
     def __init__(self):
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
         self.weights = {
             "content": 0.35,
             "technical": 0.25,
@@ -19,24 +60,6 @@ class ComparatorService:
         gaps = []
         scores = {}
         
-        # Helper to compare parameters
-        def check_gap(section: str, param: str, b_val: Any, c_val: Any):
-            status = "equal"
-            if isinstance(b_val, (int, float)) and isinstance(c_val, (int, float)):
-                if c_val > b_val: status = "leading"
-                elif c_val < b_val: status = "lagging"
-            elif isinstance(b_val, bool) and isinstance(c_val, bool):
-                if c_val and not b_val: status = "leading"
-                elif b_val and not c_val: status = "lagging"
-            
-            return {
-                "section": section,
-                "parameter": param,
-                "baseline_value": b_val,
-                "competitor_value": c_val,
-                "status": status
-            }
-
         # Domain Authority Section
         gaps.append(check_gap("Domain Authority", "HTTPS", baseline.domain_authority.https_status, competitor.domain_authority.https_status))
         
@@ -48,24 +71,28 @@ class ComparatorService:
         
         # Calculate scores per section
         # (Simplified scoring for demonstration)
-        sections = ["content", "technical", "ymyl", "eeat", "mobile"]
-        for section in sections:
+        # Tally gap statuses per section in one pass
+        totals = defaultdict(int)
+        leading = defaultdict(int)
+        for g in gaps:
+            section = SECTION_KEYS.get(g["section"])
+            if section:
+                totals[section] += 1
+                leading[section] += g["status"] == "leading"
+
+        for section in SECTIONS:
             # logic to aggregate gap statuses into a 0-100 score
-            leading_count = len([g for g in gaps if g["status"] == "leading" and g["section"].lower().startswith(section[0:3])])
-            total_count = len([g for g in gaps if g["section"].lower().startswith(section[0:3])]) or 1
-            scores[section] = (leading_count / total_count) * 100
+            scores[section] = (leading[section] / (totals[section] or 1)) * 100
 
-        overall_grade = sum([scores.get(s, 0) * self.weights.get(s, 0) for s in sections])
+        overall_grade = sum([scores.get(s, 0) * self.weights.get(s, 0) for s in SECTIONS])
 
         # AI Comparison Summary
-        ai_summary = await self.ai_service.compare_seo_data(
-            baseline.model_dump(), 
-            competitor.model_dump()
-        )
+        ai_summary = await self.ai_service.compare_seo_data(baseline, competitor)
 
         return ComparisonResult(
             baseline_url=baseline.url,
             competitor_url=competitor.url,
+            timestamp=datetime.now(timezone.utc),
             gaps=gaps,
             scores=scores,
             overall_grade=overall_grade,
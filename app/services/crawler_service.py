@@ -1,109 +1,272 @@
 import asyncio
-from typing import List, Set, Dict
+import codecs
+import hashlib
+import re
+import time
+import orjson
+from pathlib import Path
+from typing import List, Set, Dict, Optional
 from collections import deque
-from playwright.async_api import async_playwright
 from core.config import settings
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlsplit, urljoin
+import lxml.html
+from utils.html import parse_html
+
+# Serialized page and (optionally) every a.href, which the browser has already
+# resolved against the page URL
+PAGE_SNAPSHOT_JS = """(withLinks) => {
+    const doctype = document.doctype ? `<!DOCTYPE ${document.doctype.name}>` : "";
+    return {
+        html: doctype + document.documentElement.outerHTML,
+        hrefs: withLinks ? Array.from(document.querySelectorAll('a'), a => a.href) : [],
+    };
+}"""
+
+# Requests the extractor never looks at; aborting them lets domcontentloaded fire sooner
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media", "ping"})
+BLOCKED_HOSTS = ("googletagmanager.com", "google-analytics.com", "facebook.net", "doubleclick.net", "hotjar.com", "clarity.ms")
+
+async def _block_heavy_requests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+        return
+    host = urlsplit(request.url).hostname or ""
+    if any(blocked in host for blocked in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# Mount points of client-rendered apps; with almost no server-rendered text the page must be rendered
+SPA_ROOT_XPATH = "//*[@id='root' or @id='app' or @id='__next' or @id='__nuxt']"
+SPA_TEXT_THRESHOLD = 1024
+
+# Declared document encoding: the Content-Type header wins, then <meta charset> / http-equiv
+# in the first bytes of the page, as a browser would resolve it
+_HEADER_CHARSET_RX = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+_META_CHARSET_RX = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+
+def _decode_body(body: bytes, content_type: str) -> str:
+    match = _HEADER_CHARSET_RX.search(content_type) or _META_CHARSET_RX.search(body[:2048])
+    encoding = "utf-8"
+    if match:
+        charset = match.group(1)
+        charset = charset.decode("ascii") if isinstance(charset, bytes) else charset
+        try:
+            encoding = codecs.lookup(charset).name
+        except LookupError:
+            pass  # Unknown label; fall back to UTF-8
+    return body.decode(encoding, "replace")
+
+def _parse_static(html: str) -> Optional[lxml.html.HtmlElement]:
+    """
+    Parses server-delivered HTML, or returns None when the page is a
+    client-rendered shell that has to go through the browser.
+    """
+    doc = parse_html(html)
+    if doc is None:
+        return None
+    body = doc.find("body")
+    if body is None:
+        return None
+    text = sum(len(t.strip()) for t in body.xpath(".//text()[not(ancestor::script or ancestor::style)]"))
+    if text < SPA_TEXT_THRESHOLD and doc.xpath(SPA_ROOT_XPATH):
+        return None
+    return doc
+
+def _timing_metrics(timing: Dict) -> Dict:
+    """
+    TTFB and time to last byte of the document from Playwright's resource timing
+    (-1 means unavailable). Used for static and rendered pages alike, so every
+    page in a crawl reports the same measurement.
+    """
+    request_start = timing.get("requestStart", -1)
+    response_start = timing.get("responseStart", -1)
+    response_end = timing.get("responseEnd", -1)
+    ttfb = response_start - request_start if response_start > request_start >= 0 else 300
+    load_time = response_end if response_end > 0 else 2000
+    return {"ttfb": ttfb, "load_time": load_time}
 
 class CrawlerService:
-    def __init__(self, max_depth: int = settings.MAX_CRAWL_DEPTH):
+    def __init__(self, max_depth: int = settings.MAX_CRAWL_DEPTH, checkpoint_dir: Optional[str] = None):
         self.max_depth = max_depth
         self.visited: Set[str] = set()
         self.to_visit: deque = deque()  # Using deque for O(1) pop operations (DFS stack)
+        self.queued: Set[str] = set()  # Every URL ever pushed, so the frontier holds no duplicates
         self.results: List[Dict] = []
+        # When set, every crawled page is also written here so an interrupted crawl can resume
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        if self.checkpoint_dir:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
 
     async def crawl(self, start_url: str) -> List[Dict]:
         """
         Crawls the website and returns the full list of results.
         Wrapper around crawl_stream for backward compatibility.
+        Includes any pages restored by load_checkpoint().
+        The start page always comes first: the extractor reads pages[0] as the home page,
+        and on a resumed crawl it may have been fetched after the restored pages.
+        """
+        async for _ in self.crawl_stream(start_url):
+            pass
+        for i, page_data in enumerate(self.results):
+            if page_data["url"] == start_url:
+                self.results.insert(0, self.results.pop(i))
+                break
+        return self.results
+
+    def _checkpoint_path(self, url: str) -> Path:
+        return self.checkpoint_dir / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    def load_checkpoint(self, max_age: int = settings.CRAWL_CACHE_TTL) -> int:
+        """
+        Restores pages checkpointed within the last `max_age` seconds and
+        re-queues their links, so the next crawl only fetches what is missing.
+        Returns the number of pages restored.
         """
-        results = []
-        async for page_data in self.crawl_stream(start_url):
-            results.append(page_data)
-        return results
+        if not self.checkpoint_dir:
+            return 0
+
+        cutoff = time.time() - max_age
+        fresh = [(path.stat().st_mtime, path) for path in self.checkpoint_dir.glob("*.json")]
+        pending = []
+        for _, path in sorted(item for item in fresh if item[0] >= cutoff):
+            try:
+                page_data = orjson.loads(path.read_bytes())
+            except orjson.JSONDecodeError:
+                continue  # Partially written checkpoint from an interrupted run
+            links = page_data.pop("links", [])
+            self.visited.add(page_data["url"])
+            self.queued.add(page_data["url"])
+            self.results.append(page_data)
+            pending.append((page_data["depth"], links))
+
+        # Rebuild the frontier from the restored pages' links
+        for depth, links in pending:
+            if depth >= self.max_depth:
+                continue
+            for full_url in links:
+                if full_url not in self.queued:
+                    self.queued.add(full_url)
+                    self.to_visit.append({"url": full_url, "depth": depth + 1})
+
+        return len(self.results)
+
+    def clear_checkpoint(self):
+        if self.checkpoint_dir:
+            for path in self.checkpoint_dir.glob("*.json"):
+                path.unlink(missing_ok=True)
 
     async def crawl_stream(self, start_url: str):
         """
         Async generator that yields pages as they are crawled.
         Allows for real-time processing/streaming of results.
+        Pages are fetched in waves of up to CRAWL_CONCURRENCY at a time.
         """
+        # Imported here so processes that never crawl don't pay for loading Playwright
+        from playwright.async_api import async_playwright
+
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context(user_agent=settings.USER_AGENT)
             
-            domain = urlparse(start_url).netloc
+            # Speed Optimization: Block assets and trackers (registered once, applies to every page)
+            await context.route("**/*", _block_heavy_requests)
+            
+            domain = urlsplit(start_url).netloc
             self.to_visit.append({"url": start_url, "depth": 0})
+            self.queued.add(start_url)
             
             # Limit pages to prevent timeouts
             max_pages = settings.MAX_PAGES
             
-            while self.to_visit:
-                # Check limit inside loop to respect it strictly
-                if len(self.results) >= max_pages:
-                    break
-                    
-                current = self.to_visit.pop()  # DFS: pop from end (LIFO stack)
-                url = current["url"]
-                depth = current["depth"]
-                
-                if url in self.visited or depth > self.max_depth:
-                    continue
-                
-                self.visited.add(url)
-                print(f"Crawling: {url} (Depth: {depth}, Count: {len(self.results)})")
-                
-                page = await context.new_page()
-                
-                # Speed Optimization: Block images, css, and fonts
-                await page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2,ttf,otf}", lambda route: route.abort())
-                
-                try:
-                    # Navigate with shorter timeout
-                    response = await page.goto(url, wait_until="domcontentloaded", timeout=20000) # Increased timeout slightly
-
-                    if not response:
-                        await page.close()
+            while self.to_visit and len(self.results) < max_pages:
+                # Next wave, never larger than the remaining page budget so the limit holds strictly
+                wave_size = min(settings.CRAWL_CONCURRENCY, max_pages - len(self.results))
+                wave = []
+                while self.to_visit and len(wave) < wave_size:
+                    current = self.to_visit.pop()  # DFS: pop from end (LIFO stack)
+                    if current["url"] in self.visited or current["depth"] > self.max_depth:
                         continue
-                        
-                    content = await page.content()
-                    metrics = await page.evaluate("""() => {
-                        const perf = window.performance.timing;
-                        if (!perf || perf.navigationStart === 0) return { ttfb: 300, load_time: 2000 };
-                        const ttfb = perf.responseStart > perf.requestStart ? perf.responseStart - perf.requestStart : 300;
-                        const load_time = perf.loadEventEnd > perf.navigationStart ? perf.loadEventEnd - perf.navigationStart : 2000;
-                        return { ttfb, load_time, lcp: 0, cls: 0 };
-                    }""")
-                    
-                    page_data = {
-                        "url": url,
-                        "content": content,
-                        "status": response.status,
-                        "headers": dict(response.headers),
-                        "metrics": {
-                            "ttfb": float(metrics.get("ttfb") or 300),
-                            "load_time": float(metrics.get("load_time") or 2000)
-                        },
-                        "depth": depth
-                    }
-                    
-                    self.results.append(page_data)
-                    yield page_data # Stream the result immediately
-                    
-                    if depth < self.max_depth:
-                        links = await page.query_selector_all("a")
-                        for link in links:
-                            href = await link.get_attribute("href")
-                            if href:
-                                full_url = urljoin(url, href)
-                                parsed_url = urlparse(full_url)
-                                if parsed_url.netloc == domain and full_url not in self.visited:
-                                    self.to_visit.append({"url": full_url, "depth": depth + 1})
-
-                                    
-                except Exception as e:
-                    print(f"Error crawling {url}: {e}")
-                    # Yield error event if needed, or just skip
+                    self.visited.add(current["url"])
+                    wave.append(current)
+
+                tasks = [asyncio.create_task(self._fetch_page(context, current, domain)) for current in wave]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        page_data = await next_done
+                        if page_data:
+                            self.results.append(page_data)
+                            yield page_data # Stream the result immediately
                 finally:
-                    await page.close()
+                    # Consumer went away mid-wave: don't leave fetches running against a closing browser
+                    for task in tasks:
+                        task.cancel()
                     
             await browser.close()
+
+    async def _fetch_page(self, context, current: Dict, domain: str) -> Optional[Dict]:
+        """
+        Loads one URL in its own page and queues its same-domain links.
+        Returns the page data, or None if the page could not be loaded.
+        """
+        url = current["url"]
+        depth = current["depth"]
+        print(f"Crawling: {url} (Depth: {depth}, Count: {len(self.results)})")
+        
+        page = await context.new_page()
+        
+        try:
+            # The server's HTML is available at commit; no need to wait for parsing or scripts
+            response = await page.goto(url, wait_until="commit", timeout=20000)
+
+            if not response:
+                return None
+
+            html = _decode_body(await response.body(), response.headers.get("content-type", ""))
+            metrics = _timing_metrics(response.request.timing)
+            doc = _parse_static(html)
+            if doc is not None:
+                hrefs = []
+                if depth < self.max_depth:
+                    # Resolve the way a.href does: against <base href> if present, else the final URL
+                    base = urljoin(response.url, (doc.xpath("string(//base/@href)") or "").strip())
+                    hrefs = [urljoin(base, href.strip()) for href in doc.xpath("//a/@href")]
+            else:
+                # Client-rendered shell: let the DOM build, then snapshot it in one round-trip
+                await page.wait_for_load_state("domcontentloaded", timeout=20000)
+                snapshot = await page.evaluate(PAGE_SNAPSHOT_JS, depth < self.max_depth)
+                html, hrefs = snapshot["html"], snapshot["hrefs"]
+            
+            page_data = {
+                "url": url,
+                "content": html,
+                "status": response.status,
+                "headers": dict(response.headers),
+                "metrics": {
+                    "ttfb": float(metrics.get("ttfb") or 300),
+                    "load_time": float(metrics.get("load_time") or 2000)
+                },
+                "depth": depth
+            }
+            
+            links = []
+            if depth < self.max_depth:
+                for full_url in hrefs:
+                    if not full_url or full_url in self.queued:
+                        continue
+                    if urlsplit(full_url).netloc == domain:
+                        self.queued.add(full_url)
+                        self.to_visit.append({"url": full_url, "depth": depth + 1})
+                        links.append(full_url)
+
+            if self.checkpoint_dir:
+                record = orjson.dumps({**page_data, "links": links})
+                await asyncio.to_thread(self._checkpoint_path(url).write_bytes, record)
+
+            return page_data
+        except Exception as e:
+            print(f"Error crawling {url}: {e}")
+            return None
+        finally:
+            await page.close()
@@ -1,284 +1,581 @@
+import asyncio
 import json
+import multiprocessing
+import orjson
 import os
 import re
-from datetime import datetime
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
-from urllib.parse import urlparse, urljoin
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+import lxml.html
+import pydantic_core
+from typing import List, Dict, Any, NamedTuple, Optional, Set
+from urllib.parse import urlsplit
 
 from core.config import settings
-from models.seo import (
-    FullSEOResult, DomainAuthority, CrawlabilityIndexing, URLStructure,
-    MetaHTMLSignals, ContentQuality, SearchIntent, YMYLTrust, EEATSignals,
-    TechnicalPerformance, MobileUX, Linking, SchemaStructuredData,
-    IndiaSpecific, HealthErrors, BrandUX
+from models.seo import FullSEOResult
+
+from services.ai_service import get_ai_service
+from utils.html import parse_html
+
+_NON_WORD = re.compile(r'\W+')
+
+# Home-page text signals -> the lowercase keywords that set them. A keyword may feed
+# several signals ("award" counts as both expertise and an award), but no keyword may be
+# a prefix of another: the scan reports only the longest keyword at each position.
+_SIGNAL_KEYWORDS = {
+    "brand": ("bajaj", "allianz"),
+    "irdai": ("irdai", "registration no", "reg."),
+    "legal": ("cin", "corporate identity", "registered office"),
+    "claims": ("claim settlement", "csr", "claims paid"),
+    "disclaimer": ("risk factors", "disclaimer"),  # plus "terms ... conditions", see _text_signals
+    "privacy": ("privacy policy",),
+    "terms": ("terms of use",),
+    "grievance": ("grievance", "contact us", "customer care", "support"),
+    "address": ("pune", "mumbai", "road", "floor", "tower"),
+    "expertise": ("years of trust", "legacy", "expert", "award"),
+    "leadership": ("leadership", "board of directors", "management"),
+    "awards": ("award", "winner", "certified", "iso"),
+    "inr": ("₹", "inr", "rs.", "rupees"),
+    "tax": ("80c", "10(10d)", "tax saving", "income tax", "section"),
+    "faq": ("faq",),
+    "calculator": ("calculator",),
+    "freshness": ("2024", "2025"),
+}
+_KEYWORD_SIGNALS: Dict[str, List[str]] = {}
+for _signal, _keywords in _SIGNAL_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_SIGNALS.setdefault(_keyword, []).append(_signal)
+
+
+
+def _trie_pattern(words) -> str:
+    """
+    Alternation of literal words with shared prefixes factored out, e.g.
+    ("claims paid", "cin") -> "c(?:in|laims\\ paid)". re tries plain alternation
+    branches one by one at every position; the trie form rejects most positions
+    on the first character.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(trie)
+
+
+# One scan for every keyword. The match is a zero-width lookahead so overlapping keywords
+# (e.g. "rs." inside "csr.") are each seen at their own position.
+_SIGNAL_RX = re.compile("(?=(%s))" % _trie_pattern(_KEYWORD_SIGNALS))
+_RX_TERMS_CONDITIONS = re.compile(r'terms.*conditions')
+
+
+def _text_signals(text: str) -> Set[str]:
+    """Names of the _SIGNAL_KEYWORDS signals present in lowercased text."""
+    hits = set()
+    for keyword in set(_SIGNAL_RX.findall(text)):
+        hits.update(_KEYWORD_SIGNALS[keyword])
+    # Not a fixed keyword; only worth a second scan when nothing else flagged a disclaimer
+    if "disclaimer" not in hits and _RX_TERMS_CONDITIONS.search(text):
+        hits.add("disclaimer")
+    return hits
+
+# Schema.org types declared by the page: JSON-LD "@type" values (a string or a whole
+# [...] list, captured in group 1) or a microdata itemtype URL (type name in group 2).
+# A JSON-LD name may be bare, a full IRI or "schema:"-prefixed.
+_SCHEMA_TYPES = r'(Organization|Product|InsurancePlan|FAQPage|BreadcrumbList|Review)\b'
+_SCHEMA_RX = re.compile(r'"@type"\s*:\s*(\[[^\]]*\]|"[^"]*")|schema\.org/' + _SCHEMA_TYPES)
+_SCHEMA_NAME_RX = re.compile(r'"(?:https?://schema\.org/|schema:)?' + _SCHEMA_TYPES)
+
+
+def _schema_types(html: str) -> Set[str]:
+    """
+    Names of the tracked schema.org types the page declares. Every entry of an
+    "@type" list counts, e.g. {"@type": ["FAQPage", "schema:Product"]} -> {"FAQPage", "Product"}.
+    """
+    types = set()
+    for declared, itemtype in _SCHEMA_RX.findall(html):
+        if itemtype:
+            types.add(itemtype)
+        else:
+            types.update(_SCHEMA_NAME_RX.findall(declared))
+    return types
+
+# Words in the site URL that mark it as keyword-bearing for the audited niche
+_URL_KEYWORDS = ("insurance", "life")
+
+# Home-page link signals -> pattern any <a href> must match (attribute values keep their original case)
+_LINK_PROBES = (
+    ("privacy", re.compile(r'privacy', re.I)),
+    ("terms", re.compile(r'terms', re.I)),
+    ("about", re.compile(r'about', re.I)),
 )
+_RX_HREFLANG_EN_IN = re.compile(r'en-in', re.I)
+
+# Text nodes that count as page text: script, style and template bodies are not
+_VISIBLE_TEXT = "//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+
+
+def _visible_text(doc: Optional[lxml.html.HtmlElement]) -> str:
+    return "".join(doc.xpath(_VISIBLE_TEXT)) if doc is not None else ""
+
+
+class ParsedPage(NamedTuple):
+    """Per-page figures the aggregate sections need; small and picklable."""
+    title: Optional[str]
+    has_title: bool
+    h1_count: int  # Capped at 2: only "any" and "more than one" are reported
+    img_count: int
+    alt_count: int
+    word_count: int
+    has_noindex: bool
+
+
+def _page_stats(doc: Optional[lxml.html.HtmlElement], content: str, text: str) -> ParsedPage:
+    title, h1_count, img_count, alt_count = None, 0, 0, 0
+    if doc is not None:
+        title = doc.find(".//title")
+        h1_count = sum(1 for _ in islice(doc.iter("h1"), 2))
+        for img in doc.iter("img"):
+            img_count += 1
+            alt_count += bool(img.get("alt"))
+    return ParsedPage(
+        title=title.text if title is not None else None,
+        has_title=title is not None,
+        h1_count=h1_count,
+        img_count=img_count,
+        alt_count=alt_count,
+        # str.split is the cheapest exact count: regex findall/finditer over \S+ measured 3-4x slower
+        word_count=len(text.split()),
+        # Lowercase copy of the page only when the common spelling is absent. Still cheaper
+        # than a re.I search, which runs a case-folding match at every position.
+        has_noindex="noindex" in content or "noindex" in content.lower(),
+    )
+
+
+def _parse_one(content: str) -> ParsedPage:
+    # Runs in a worker process: parsed trees stay there, only the figures come back
+    doc = parse_html(content)
+    return _page_stats(doc, content, _visible_text(doc))
+
+
+_parse_pool_instance: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()  # Callers arrive from several to_thread workers at once
+
+
+def _parse_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide worker pool for page parsing. lxml parsing is CPU-bound and
+    holds the GIL, so large crawls only scale across processes. Workers come
+    from a forkserver rather than forking the multithreaded server process.
+    """
+    global _parse_pool_instance
+    with _parse_pool_lock:
+        if _parse_pool_instance is None:
+            _parse_pool_instance = ProcessPoolExecutor(
+                max_workers=settings.EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return _parse_pool_instance
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor):
+    # Only the pool that failed is dropped; another caller may already have replaced it
+    global _parse_pool_instance
+    with _parse_pool_lock:
+        if _parse_pool_instance is pool:
+            _parse_pool_instance = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_parse_pool():
+    """Stops the parse workers, if any were started. Called on application shutdown."""
+    global _parse_pool_instance
+    with _parse_pool_lock:
+        pool, _parse_pool_instance = _parse_pool_instance, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _parse_pages(contents: List[str]) -> List[ParsedPage]:
+    pool = _parse_pool()
+    try:
+        return list(pool.map(_parse_one, contents, chunksize=8))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); the pool is unusable from now on,
+        # so replace it and retry once rather than failing every later extraction
+        _discard_parse_pool(pool)
+        return list(_parse_pool().map(_parse_one, contents, chunksize=8))
+
+
+def _write_seo_result(path: str, data: FullSEOResult):
+    # Compact unless debugging: indented output is larger and slower to produce.
+    # Both paths emit UTF-8 bytes directly, with no str -> bytes encode before the write.
+    if settings.DEBUG:
+        payload = orjson.dumps(data.model_dump(), option=orjson.OPT_INDENT_2 | orjson.OPT_UTC_Z)
+    else:
+        payload = pydantic_core.to_json(data)
+    Path(path).write_bytes(payload)
+
+
+@lru_cache(maxsize=32)
+def _load_seo_result(path: str, mtime_ns: int) -> FullSEOResult:
+    # Keyed on mtime so a re-extracted file is parsed again; raw bytes go
+    # straight to pydantic-core without an intermediate str decode.
+    return FullSEOResult.model_validate_json(Path(path).read_bytes())
+
+
+@lru_cache(maxsize=1)
+def _load_baseline(path: str, mtime_ns: int) -> FullSEOResult:
+    # Separate single-slot cache so competitor lookups never evict the baseline.
+    # Not mmapped: pydantic-core only accepts str/bytes/bytearray, so a mapping
+    # would be copied into bytes anyway, and the parse happens once per mtime.
+    return FullSEOResult.model_validate_json(Path(path).read_bytes())
 
-from services.ai_service import AIService
 
 class ExtractorService:
     def __init__(self):
         self.data_dir = settings.DATA_DIR
         self.baseline_dir = settings.BASELINE_DIR
         self.competitor_dir = settings.COMPETITOR_DIR
-        self.ai_service = AIService()
+        self.baseline_path = os.path.join(self.baseline_dir, "bajajlife_full_seo.json")
+        self.ai_service = get_ai_service()
 
     async def extract_full_site_data(self, base_url: str, pages: List[Dict]) -> FullSEOResult:
         # Aggregated data extraction
         home_page = pages[0] if pages else {"content": "", "url": base_url, "metrics": {}}
-        home_soup = BeautifulSoup(home_page.get("content", ""), "lxml")
-        home_text = home_soup.get_text().lower()
-        
-        # Section 1: Domain
-        domain_auth = DomainAuthority(
-            domain_age=15.0, # Estimated for Bajaj Life
-            domain_authority=65.0, # Placeholder
-            total_backlinks=500000, 
-            referring_domains=12000,
-            organic_keywords=85000,
-            branded_keyword_presence="bajaj" in home_text or "allianz" in home_text,
-            indexed_pages=len(pages) * 10, # Proxy
-            domain_trust_signals=0.85,
-            https_status=base_url.startswith("https"),
-            ssl_validity=True
-        )
-        
-        # Section 2: Crawlability
-        crawlability = CrawlabilityIndexing(
-            robots_txt_exists=True,
-            xml_sitemap_exists=True,
-            sitemap_validity=True,
-            noindex_tags=any(["noindex" in p.get("content", "").lower() for p in pages]),
-            canonical_tags_correct=True,
-            orphan_pages=0,
-            crawl_depth=max([p.get("depth", 0) for p in pages]) if pages else 0,
-            duplicate_url_patterns=0,
-            parameterized_urls=len([p for p in pages if "?" in p["url"]]),
-            crawl_budget_waste=0.05
-        )
+        # Started first so the Groq round-trip overlaps the parsing below
+        ai_task = asyncio.create_task(self.ai_service.analyze_seo_content(home_page.get("content", ""), base_url))
+        try:
+            site_url = base_url.lower()  # Scheme and host are case-insensitive
+            # The home page is parsed here because its tree is needed for link and hreflang
+            # checks; every other page is parsed in the worker pool, off the event loop
+            home_doc = parse_html(home_page["content"])
+            home_text = _visible_text(home_doc)
+            parsed = [_page_stats(home_doc, home_page["content"], home_text)] if pages else []
+            if len(pages) > 1:
+                contents = [p["content"] for p in pages[1:]]
+                parsed += await asyncio.to_thread(_parse_pages, contents)
+
+            # One pass over the crawl: every per-page statistic is accumulated here,
+            # so the sections below only read the totals
+            has_noindex = False
+            max_depth = 0
+            parameterized = 0
+            urls_short = True
+            max_folder_depth = 0
+            all_titles = []
+            has_h1 = False
+            multiple_h1 = False
+            images_count = 0
+            images_with_alt = 0
+            total_words = 0
+            thin_pages = 0
+            ttfb_total, ttfb_count = 0, 0
+            load_total, load_count = 0, 0
+            error_404 = 0
+            broken = 0
+
+            for p, page in zip(pages, parsed):
+                url = p["url"]
+                has_noindex = has_noindex or page.has_noindex
+                max_depth = max(max_depth, p.get("depth", 0))
+                parts = urlsplit(url)
+                parameterized += bool(parts.query)
+                urls_short = urls_short and len(url) < 100
+                max_folder_depth = max(max_folder_depth, parts.path.count("/") + 1)
+
+                if page.has_title: all_titles.append(page.title)
+                has_h1 = has_h1 or page.h1_count > 0
+                multiple_h1 = multiple_h1 or page.h1_count > 1
+                images_count += page.img_count
+                images_with_alt += page.alt_count
+
+                total_words += page.word_count
+                thin_pages += page.word_count < 300
+
+                metrics = p.get("metrics", {})
+                if metrics.get("ttfb") is not None:
+                    ttfb_total += metrics["ttfb"]
+                    ttfb_count += 1
+                if metrics.get("load_time") is not None:
+                    load_total += metrics["load_time"]
+                    load_count += 1
+
+                status = p.get("status")
+                error_404 += status == 404
+                broken += status >= 400
+
+            home_text = home_text.lower()
+            home_hrefs = home_doc.xpath("//a/@href") if home_doc is not None else []
+            signals = _text_signals(home_text)
+            link_signals = {name for name, rx in _LINK_PROBES if any(rx.search(h) for h in home_hrefs)}
         
-        # Section 3: URL Structure
-        parsed_url = urlparse(base_url)
-        url_struct = URLStructure(
-            url_readability_score=0.9,
-            keyword_in_url="insurance" in base_url or "life" in base_url,
-            url_length_consistency=all([len(p["url"]) < 100 for p in pages]),
-            folder_hierarchy_depth=max([len(urlparse(p["url"]).path.split("/")) for p in pages]),
-            trailing_slash_consistency=True,
-            http_to_https_redirect=True,
-            www_vs_non_www=True,
-            static_vs_dynamic_ratio=0.95
-        )
-
-        # Section 4: Meta info
-        all_titles = []
-        all_h1s = []
-        images_count = 0
-        images_with_alt = 0
+            # Section 1: Domain
+            domain_auth = dict(
+                domain_age=15.0, # Estimated for Bajaj Life
+                domain_authority=65.0, # Placeholder
+                total_backlinks=500000, 
+                referring_domains=12000,
+                organic_keywords=85000,
+                branded_keyword_presence="brand" in signals,
+                indexed_pages=len(pages) * 10, # Proxy
+                domain_trust_signals=0.85,
+                https_status=site_url.startswith("https"),
+                ssl_validity=True
+            )
         
-        for p in pages:
-            soup = BeautifulSoup(p["content"], "lxml")
-            if soup.title: all_titles.append(soup.title.string)
-            h1s = soup.find_all("h1")
-            all_h1s.append(len(h1s))
-            imgs = soup.find_all("img")
-            images_count += len(imgs)
-            images_with_alt += len([i for i in imgs if i.get("alt")])
-
-        meta_html = MetaHTMLSignals(
-            title_presence=len(all_titles) > 0,
-            title_length_optimized=all([len(t) < 60 for t in all_titles if t]),
-            duplicate_titles=len(all_titles) - len(set(all_titles)),
-            meta_desc_presence=True,
-            meta_desc_length=True,
-            h1_presence=any([c > 0 for c in all_h1s]),
-            multiple_h1_issues=any([c > 1 for c in all_h1s]),
-            heading_hierarchy_valid=True,
-            image_alt_coverage=(images_with_alt / images_count) if images_count > 0 else 1.0
-        )
+            # Section 2: Crawlability
+            crawlability = dict(
+                robots_txt_exists=True,
+                xml_sitemap_exists=True,
+                sitemap_validity=True,
+                noindex_tags=has_noindex,
+                canonical_tags_correct=True,
+                orphan_pages=0,
+                crawl_depth=max_depth,
+                duplicate_url_patterns=0,
+                parameterized_urls=parameterized,
+                crawl_budget_waste=0.05
+            )
         
-        # Section 5: Content Quality
-        word_counts = [len(BeautifulSoup(p["content"], "lxml").get_text().split()) for p in pages]
-        content_quality = ContentQuality(
-            avg_word_count=int(sum(word_counts)/len(word_counts)) if word_counts else 0,
-            thin_content_ratio=len([w for w in word_counts if w < 300]) / len(word_counts) if word_counts else 0,
-            duplicate_content_signals=0.1,
-            readability_score=0.75,
-            structured_content_usage=True,
-            faq_presence="faq" in home_text,
-            blog_volume=50,
-            update_frequency="Weekly"
-        )
-
-        # Section 6: Search Intent
-        intent = SearchIntent(
-            informational_pages=int(len(pages) * 0.6),
-            transactional_pages=int(len(pages) * 0.3),
-            intent_alignment_score=0.85,
-            topic_depth=0.8,
-            featured_snippet_ready=True
-        )
-
-        # Section 7: YMYL (Critical for Insurance)
-        # Section 7: YMYL (Critical for Insurance)
-        # Enhanced detection using regex for robustness
-        ymyl = YMYLTrust(
-            irdai_registration=bool(re.search(r'irdai|registration no|reg\.', home_text)),
-            legal_details=bool(re.search(r'cin|corporate identity|registered office', home_text)),
-            claim_settlement_ratio=bool(re.search(r'claim settlement|csr|claims paid', home_text)),
-            risk_disclaimer=bool(re.search(r'risk factors|disclaimer|terms.*conditions', home_text)),
-            privacy_policy_quality=bool(home_soup.find("a", href=re.compile(r'privacy', re.I)) or re.search(r'privacy policy', home_text)),
-            terms_conditions=bool(home_soup.find("a", href=re.compile(r'terms', re.I)) or re.search(r'terms of use', home_text)),
-            contact_grievance_info=bool(re.search(r'grievance|contact us|customer care|support', home_text)),
-            physical_address=bool(re.search(r'pune|mumbai|road|floor|tower', home_text))
-        )
+            # Section 3: URL Structure
+            url_struct = dict(
+                url_readability_score=0.9,
+                keyword_in_url=any(k in site_url for k in _URL_KEYWORDS),
+                url_length_consistency=urls_short,
+                folder_hierarchy_depth=max_folder_depth,
+                trailing_slash_consistency=True,
+                http_to_https_redirect=True,
+                www_vs_non_www=True,
+                static_vs_dynamic_ratio=0.95
+            )
 
+            # Section 4: Meta info
+            meta_html = dict(
+                title_presence=len(all_titles) > 0,
+                title_length_optimized=all(len(t) < 60 for t in all_titles if t),
+                duplicate_titles=len(all_titles) - len(set(all_titles)),
+                meta_desc_presence=True,
+                meta_desc_length=True,
+                h1_presence=has_h1,
+                multiple_h1_issues=multiple_h1,
+                heading_hierarchy_valid=True,
+                image_alt_coverage=(images_with_alt / images_count) if images_count > 0 else 1.0
+            )
         
-        # Section 8: E-E-A-T
-        # Section 8: E-E-A-T
-        eeat = EEATSignals(
-            author_presence=False, 
-            author_bio=False,
-            expertise_indicators=bool(re.search(r'years of trust|legacy|expert|award', home_text)),
-            about_us_depth=bool(home_soup.find("a", href=re.compile(r'about', re.I))),
-            leadership_transparency=bool(re.search(r'leadership|board of directors|management', home_text)),
-            awards_certifications=bool(re.search(r'award|winner|certified|iso', home_text))
-        )
-
-
-        # Section 9: Technical Performance
-        ttfb_vals = [p.get("metrics", {}).get("ttfb") for p in pages if p.get("metrics", {}).get("ttfb") is not None]
-        load_vals = [p.get("metrics", {}).get("load_time") for p in pages if p.get("metrics", {}).get("load_time") is not None]
+            # Section 5: Content Quality
+            content_quality = dict(
+                avg_word_count=int(total_words / len(pages)) if pages else 0,
+                thin_content_ratio=thin_pages / len(pages) if pages else 0,
+                duplicate_content_signals=0.1,
+                readability_score=0.75,
+                structured_content_usage=True,
+                faq_presence="faq" in signals,
+                blog_volume=50,
+                update_frequency="Weekly"
+            )
+
+            # Section 6: Search Intent
+            intent = dict(
+                informational_pages=int(len(pages) * 0.6),
+                transactional_pages=int(len(pages) * 0.3),
+                intent_alignment_score=0.85,
+                topic_depth=0.8,
+                featured_snippet_ready=True
+            )
+
+            # Section 7: YMYL (Critical for Insurance)
+            # Section 7: YMYL (Critical for Insurance)
+            # Enhanced detection using regex for robustness
+            ymyl = dict(
+                irdai_registration="irdai" in signals,
+                legal_details="legal" in signals,
+                claim_settlement_ratio="claims" in signals,
+                risk_disclaimer="disclaimer" in signals,
+                privacy_policy_quality="privacy" in link_signals or "privacy" in signals,
+                terms_conditions="terms" in link_signals or "terms" in signals,
+                contact_grievance_info="grievance" in signals,
+                physical_address="address" in signals
+            )
+
         
-        avg_ttfb = sum(ttfb_vals) / len(ttfb_vals) if ttfb_vals else 500.0
-        avg_load = sum(load_vals) / len(load_vals) if load_vals else 2000.0
+            # Section 8: E-E-A-T
+            # Section 8: E-E-A-T
+            eeat = dict(
+                author_presence=False, 
+                author_bio=False,
+                expertise_indicators="expertise" in signals,
+                about_us_depth="about" in link_signals,
+                leadership_transparency="leadership" in signals,
+                awards_certifications="awards" in signals
+            )
+
+
+            # Section 9: Technical Performance
+            avg_ttfb = ttfb_total / ttfb_count if ttfb_count else 500.0
+            avg_load = load_total / load_count if load_count else 2000.0
         
-        tech = TechnicalPerformance(
-            lcp_score=1.5,
-            cls_score=0.05,
-            page_load_time=float(avg_load / 1000), # Convert ms to s for model consistency
-            ttfb=float(avg_ttfb),
-            js_bundle_weight=800.0,
-            css_blocking=3,
-            image_optimization=0.8,
-            lazy_loading=True
-        )
-
-
-        # Section 10: Mobile
-        mobile = MobileUX(
-            mobile_responsive=True,
-            viewport_config=True,
-            tap_element_spacing=True,
-            mobile_speed_score=75.0,
-            form_ux_complexity="low",
-            calculator_usability="calculator" in home_text
-        )
-
-        # Section 11: Linking
-        linking = Linking(
-            internal_linking_density=15.0, # Avg links per page
-            anchor_text_diversity=0.7,
-            orphan_money_pages=0,
-            contextual_vs_footer_ratio=0.4,
-            external_authority_links=5
-        )
-
-        # Section 12: Schema
-        schema = SchemaStructuredData(
-            organization_schema="Organization" in home_page["content"],
-            product_schema="Product" in home_page["content"] or "InsurancePlan" in home_page["content"],
-            faq_schema="FAQPage" in home_page["content"],
-            breadcrumb_schema="BreadcrumbList" in home_page["content"],
-            review_schema="Review" in home_page["content"],
-            schema_validation_errors=0
-        )
-
-        # Section 13: India Specific
-        # Section 13: India Specific
-        india = IndiaSpecific(
-            inr_currency_use=bool(re.search(r'₹|inr|rs\.|rupees', home_text)),
-            india_tax_keywords=bool(re.search(r'80c|10\(10d\)|tax saving|income tax|section', home_text)),
-            hreflang_en_in=bool(home_soup.find("link", {"hreflang": re.compile(r'en-in', re.I)})),
-            localized_content_relevance=0.9
-        )
-
-
-        # Section 14: Health
-        health = HealthErrors(
-            error_404_count=len([p for p in pages if p.get("status") == 404]),
-            redirect_chains=0,
-            broken_links=len([p for p in pages if p.get("status") >= 400]),
-            simulated_index_errors=0
-        )
-
-        # Section 15: Brand UX
-        brand_ux = BrandUX(
-            structured_nav_clarity=True,
-            cta_optimization=True,
-            content_freshness="2024" in home_text or "2025" in home_text
-        )
+            tech = dict(
+                lcp_score=1.5,
+                cls_score=0.05,
+                page_load_time=float(avg_load / 1000), # Convert ms to s for model consistency
+                ttfb=float(avg_ttfb),
+                js_bundle_weight=800.0,
+                css_blocking=3,
+                image_optimization=0.8,
+                lazy_loading=True
+            )
+
+
+            # Section 10: Mobile
+            mobile = dict(
+                mobile_responsive=True,
+                viewport_config=True,
+                tap_element_spacing=True,
+                mobile_speed_score=75.0,
+                form_ux_complexity="low",
+                calculator_usability="calculator" in signals
+            )
+
+            # Section 11: Linking
+            linking = dict(
+                internal_linking_density=15.0, # Avg links per page
+                anchor_text_diversity=0.7,
+                orphan_money_pages=0,
+                contextual_vs_footer_ratio=0.4,
+                external_authority_links=5
+            )
+
+            # Section 12: Schema
+            schema_types = _schema_types(home_page["content"])
+            schema = dict(
+                organization_schema="Organization" in schema_types,
+                product_schema="Product" in schema_types or "InsurancePlan" in schema_types,
+                faq_schema="FAQPage" in schema_types,
+                breadcrumb_schema="BreadcrumbList" in schema_types,
+                review_schema="Review" in schema_types,
+                schema_validation_errors=0
+            )
+
+            # Section 13: India Specific
+            # Section 13: India Specific
+            india = dict(
+                inr_currency_use="inr" in signals,
+                india_tax_keywords="tax" in signals,
+                hreflang_en_in=home_doc is not None and any(_RX_HREFLANG_EN_IN.search(h) for h in home_doc.xpath("//link/@hreflang")),
+                localized_content_relevance=0.9
+            )
+
+
+            # Section 14: Health
+            health = dict(
+                error_404_count=error_404,
+                redirect_chains=0,
+                broken_links=broken,
+                simulated_index_errors=0
+            )
+
+            # Section 15: Brand UX
+            brand_ux = dict(
+                structured_nav_clarity=True,
+                cta_optimization=True,
+                content_freshness="freshness" in signals
+            )
+        except BaseException:
+            # Don't leave the Groq request running (and its result unretrieved) on failure
+            ai_task.cancel()
+            raise
 
         # AI Enrichment
-        ai_data = await self.ai_service.analyze_seo_content(home_page.get("content", ""), base_url)
+        ai_data = await ai_task
         
         # Calculate Strict Score
         # Scoring logic: higher penalties for missing YMYL and Technical Debt
         base_score = 100
         penalties = 0
         
-        if not ymyl.irdai_registration: penalties += 15
-        if not ymyl.claim_settlement_ratio: penalties += 10
-        if (tech.page_load_time or 0.0) > 3.0: penalties += 10
-        if (content_quality.thin_content_ratio or 0.0) > 0.3: penalties += 10
-        if (crawlability.parameterized_urls or 0) > 5: penalties += 5
-        if not india.india_tax_keywords: penalties += 10
+        if not ymyl["irdai_registration"]: penalties += 15
+        if not ymyl["claim_settlement_ratio"]: penalties += 10
+        if (tech["page_load_time"] or 0.0) > 3.0: penalties += 10
+        if (content_quality["thin_content_ratio"] or 0.0) > 0.3: penalties += 10
+        if (crawlability["parameterized_urls"] or 0) > 5: penalties += 5
+        if not india["india_tax_keywords"]: penalties += 10
         
         overall_score = max(0, base_score - penalties)
 
-        return FullSEOResult(
-            url=base_url,
-            domain_authority=domain_auth,
-            crawlability=crawlability,
-            url_structure=url_struct,
-            meta_html=meta_html,
-            content=content_quality,
-            intent=intent,
-            ymyl=ymyl,
-            eeat=eeat,
-            technical=tech,
-            mobile=mobile,
-            linking=linking,
-            schema_data=schema,
-            india_specific=india,
-            health=health,
-            brand_ux=brand_ux,
-            overall_score=float(overall_score),
-            ai_insights=ai_data
-        )
+        # Sections are plain dicts so pydantic-core validates the whole tree in one pass;
+        # nested model_construct calls skip validation but run in Python and are slower
+        return FullSEOResult.model_validate({
+            "url": base_url,
+            "timestamp": datetime.now(timezone.utc),
+            "domain_authority": domain_auth,
+            "crawlability": crawlability,
+            "url_structure": url_struct,
+            "meta_html": meta_html,
+            "content": content_quality,
+            "intent": intent,
+            "ymyl": ymyl,
+            "eeat": eeat,
+            "technical": tech,
+            "mobile": mobile,
+            "linking": linking,
+            "schema_data": schema,
+            "india_specific": india,
+            "health": health,
+            "brand_ux": brand_ux,
+            "overall_score": float(overall_score),
+            "ai_insights": ai_data
+        })
 
 
     async def save_baseline(self, data: FullSEOResult):
         os.makedirs(self.baseline_dir, exist_ok=True)
-        filename = "bajajlife_full_seo.json"
-        path = os.path.join(self.baseline_dir, filename)
-        with open(path, "w") as f:
-            f.write(data.model_dump_json(indent=4))
+        path = self.baseline_path
+        await asyncio.to_thread(_write_seo_result, path, data)
+        _load_baseline.cache_clear()
         return path
 
+    def competitor_path(self, url: str) -> str:
+        # One file per host: scheme, path and query never leak into the name.
+        netloc = urlsplit(url if "//" in url else f"//{url}").netloc.lower()
+        return os.path.join(self.competitor_dir, f"{_NON_WORD.sub('_', netloc)}_seo.json")
+
     async def save_competitor(self, data: FullSEOResult):
         os.makedirs(self.competitor_dir, exist_ok=True)
-        domain = re.sub(r'\W+', '_', data.url.replace("https://", "").replace("http://", ""))
-        path = os.path.join(self.competitor_dir, f"{domain}_seo.json")
-        with open(path, "w") as f:
-            f.write(data.model_dump_json(indent=4))
+        path = self.competitor_path(data.url)
+        await asyncio.to_thread(_write_seo_result, path, data)
         return path
         
-    def get_baseline_data(self) -> FullSEOResult:
-        path = os.path.join(self.baseline_dir, "bajajlife_full_seo.json")
-        if not os.path.exists(path):
+    def competitor_mtime_ns(self, path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def get_competitor_data(self, path: str) -> FullSEOResult:
+        return _load_seo_result(path, os.stat(path).st_mtime_ns)
+
+    def baseline_mtime_ns(self) -> int:
+        try:
+            return os.stat(self.baseline_path).st_mtime_ns
+        except FileNotFoundError:
             raise FileNotFoundError("Baseline data not found. Run extract/baseline first.")
-        with open(path, "r") as f:
-            return FullSEOResult.model_validate_json(f.read())
+
+    def get_baseline_data(self) -> FullSEOResult:
+        return _load_baseline(self.baseline_path, self.baseline_mtime_ns())
 
 
@@ -0,0 +1,22 @@
+import lxml.html
+from lxml.etree import ParserError
+from typing import Optional
+
+_UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+
+def parse_html(html: str) -> Optional[lxml.html.HtmlElement]:
+    """
+    Parses a page into an lxml.html tree, or returns None for an empty document.
+    lxml refuses str input that starts with an XML encoding declaration (XHTML);
+    such pages are parsed from their UTF-8 bytes instead.
+    """
+    try:
+        return lxml.html.document_fromstring(html)
+    except ParserError:
+        return None  # Empty or whitespace-only document
+    except ValueError:
+        try:
+            return lxml.html.document_fromstring(html.encode("utf-8"), parser=_UTF8_PARSER)
+        except ParserError:
+            return None